@@ -0,0 +1,2 @@
+# pytest 以 prepend 模式导入本文件时会把仓库根目录加入 sys.path，
+# 使直接运行 pytest 时也能导入 model、controller 等顶层包
@@ -1,19 +1,109 @@
 import json
 import os
 import time
+import functools
 import numpy as np
 import logging
 from model.bridge import BridgeModel
 from model.analysis_runner import AnalysisRunner
-from model.damage_evaluator import DamageEvaluator, DamageState
+from model.damage_evaluator import DamageEvaluator, DamageState, TimeHistoryResult
+from model._jit import njit, prange
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库 json
+    orjson = None
 
 logger = logging.getLogger("bridge_eval.evaluator")
 
+
+@njit(parallel=True, fastmath=True, cache=True)
+def max_abs_over_time(disp):
+    """
+    计算时程结果各列的绝对值最大值（跳过第0列时间）
+    
+    单次遍历完成取绝对值和求最大值，不产生临时数组
+    """
+    out = np.zeros(disp.shape[1] - 1)
+    for j in prange(1, disp.shape[1]):
+        m = 0.0
+        for i in range(disp.shape[0]):
+            a = abs(disp[i, j])
+            if a > m:
+                m = a
+        out[j - 1] = m
+    return out
+
+
+def _freeze_fragility(fragility):
+    """将易损性配置转换为可哈希的嵌套元组，用作缓存键"""
+    return tuple(sorted(
+        (component_type, tuple(sorted(
+            (damage_name, tuple(sorted(params.items())))
+            for damage_name, params in damage_levels.items()
+        )))
+        for component_type, damage_levels in fragility.items()
+    ))
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_fragility(frozen):
+    """
+    将冻结的易损性配置转换为以 DamageState 为键的参数字典
+    
+    相同配置的转换结果在多个评估器之间共享，调用方不应修改
+    """
+    fragility_config = {}
+    
+    for component_type, damage_levels in frozen:
+        fragility_config[component_type] = {}
+        
+        for damage_name, params in damage_levels:
+            # 将字符串损伤状态名转换为枚举
+            damage_state = getattr(DamageState, damage_name.upper())
+            fragility_config[component_type][damage_state] = dict(params)
+            
+    return fragility_config
+
+
+def _json_default(obj):
+    """JSON 序列化回调，处理 orjson/json 无法直接序列化的对象"""
+    if isinstance(obj, DamageState):
+        return obj.name
+    elif isinstance(obj, np.ndarray):
+        # orjson 仅原生支持C连续数组，其余情况在此转换
+        return obj.tolist()
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    elif hasattr(obj, '__dict__'):
+        return obj.__dict__
+    else:
+        return str(obj)
+
+
+def _damage_state_names(obj):
+    """递归地将 DamageState 替换为名称（orjson 会把枚举序列化为整数值）"""
+    if isinstance(obj, DamageState):
+        return obj.name
+    elif isinstance(obj, TimeHistoryResult):
+        return _damage_state_names(obj.to_dict())
+    elif isinstance(obj, dict):
+        return {k: _damage_state_names(v) for k, v in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [_damage_state_names(v) for v in obj]
+    return obj
+
+
 class BridgeEvaluator:
     """
     桥梁评估器类，封装整个桥梁结构分析和损伤评估流程
     """
     
+    # JIT核函数是否已在本进程中预热
+    _kernels_warmed = False
+    # OpenSees 域是进程全局的，记录当前域中模型所属评估器的标识
+    _domain_owner = None
+    
     def __init__(self, config_file=None, config_dict=None):
         """
         初始化桥梁评估器
@@ -23,9 +113,11 @@ class BridgeEvaluator:
             config_dict: 配置字典，与config_file二选一
         """
         if config_file and os.path.exists(config_file):
-            with open(config_file, 'r') as f:
-                self.config = json.load(f)
-                logger.info(f"从文件加载配置: {config_file}")
+            # 以字节读入，优先交给 orjson 解析
+            with open(config_file, 'rb') as f:
+                data = f.read()
+            self.config = orjson.loads(data) if orjson is not None else json.loads(data)
+            logger.info("从文件加载配置: %s", config_file)
         elif config_dict:
             self.config = config_dict
             logger.info("使用传入的配置字典")
@@ -43,7 +135,10 @@ class BridgeEvaluator:
             pier_height=self.config['height'],
             material_props=self.config['material']
         )
-        logger.debug(f"初始化桥梁模型: 跨度={self.config['span']}, 高度={self.config['height']}")
+        logger.debug("初始化桥梁模型: 跨度=%s, 高度=%s", self.config['span'], self.config['height'])
+        
+        # 本评估器在 OpenSees 全局域中的标识，模型在第一次分析时才构建
+        self._domain_token = object()
         
         # 创建分析运行器
         self.analysis_runner = AnalysisRunner()
@@ -52,26 +147,57 @@ class BridgeEvaluator:
         fragility_params = self._convert_fragility_config()
         self.damage_evaluator = DamageEvaluator(fragility_params)
         
+        # 预热JIT核函数，避免首次分析时承担编译开销
+        self._prewarm()
+        
+    @classmethod
+    def _prewarm(cls):
+        """用极小的输入调用各JIT核函数，触发编译并写入磁盘缓存（每个进程只执行一次）"""
+        if cls._kernels_warmed:
+            return
+        try:
+            # 使用与分析器输出相同布局和类型的数组（C连续的 float64 二维数组），
+            # 否则实际分析时仍会为新的类型签名重新编译
+            max_abs_over_time(np.zeros((2, 16)))
+            # 模型层的核函数由各模块自行预热
+            AnalysisRunner.prewarm()
+            DamageEvaluator.prewarm()
+        except Exception as e:
+            logger.debug("JIT核函数预热失败: %s", e)
+        cls._kernels_warmed = True
+        
     def _convert_fragility_config(self):
         """转换配置中的易损性参数格式"""
         if 'fragility' not in self.config:
             logger.info("配置中未找到易损性参数，使用默认值")
             return None
             
-        # 转换为损伤评估器需要的格式
-        fragility_config = {}
-        
-        for component_type, damage_levels in self.config['fragility'].items():
-            fragility_config[component_type] = {}
-            
-            for damage_name, params in damage_levels.items():
-                # 将字符串损伤状态名转换为枚举
-                damage_state = getattr(DamageState, damage_name.upper())
-                fragility_config[component_type][damage_state] = params
+        # 转换为损伤评估器需要的格式，相同配置直接复用缓存结果
+        frozen = _freeze_fragility(self.config['fragility'])
+        try:
+            fragility_config = _cached_fragility(frozen)
+        except TypeError:
+            # 参数中含有不可哈希的值时无法缓存
+            fragility_config = _cached_fragility.__wrapped__(frozen)
                 
-        logger.debug(f"转换易损性参数完成: {fragility_config.keys()}")
+        logger.debug("转换易损性参数完成: %s", fragility_config.keys())
         return fragility_config
         
+    def _prepare_model(self):
+        """
+        为下一次分析准备干净的模型状态
+        
+        域中已是本评估器的模型时只重置分析设置和荷载；
+        尚未构建或已被其他评估器的模型替换时重新构建
+        """
+        if BridgeEvaluator._domain_owner is self._domain_token:
+            self.analysis_runner.reset()
+        else:
+            # 构建前先清除标识，构建失败时下一次分析会重新构建
+            BridgeEvaluator._domain_owner = None
+            self.bridge_model.build_in_opensees()
+            BridgeEvaluator._domain_owner = self._domain_token
+        
     def run_analysis(self, analysis_types=None):
         """
         运行分析
@@ -98,63 +224,25 @@ class BridgeEvaluator:
                 # 默认总是运行模态分析
                 analysis_types.append('modal')
                 
-        logger.info(f"将要运行的分析类型: {analysis_types}")
+        logger.info("将要运行的分析类型: %s", analysis_types)
         analysis_results = {}
         
         # 按顺序运行各类型分析，避免相互干扰
-        # 1. 静态分析
-        if 'static' in analysis_types:
+        analyses = [
+            ('static', '静态', self._run_static),
+            ('modal', '模态', self._run_modal),
+            ('time_history', '时程', self._run_time_history),
+        ]
+        for name, label, run in analyses:
+            if name not in analysis_types:
+                continue
             try:
-                print("运行static分析...")
-                # 构建模型
-                self.bridge_model.build_in_opensees()
-                
-                static_load = self.config['analysis'].get('static_load', 100.0)
-                disp = self.analysis_runner.run_static_analysis(static_load)
-                analysis_results['static_displacement'] = disp
-                logger.info(f"静态分析完成，最大位移: {disp}")
-            except Exception as e:
-                logger.error(f"静态分析失败: {e}", exc_info=True)
-        
-        # 2. 模态分析
-        if 'modal' in analysis_types:
-            try:
-                print("运行modal分析...")
-                # 构建模型（重新构建以确保干净的状态）
-                self.bridge_model.build_in_opensees()
-                
-                num_modes = self.config.get('num_modes', 3)
-                periods = self.analysis_runner.run_modal_analysis(num_modes)
-                analysis_results['modal_periods'] = periods
-                logger.info(f"模态分析完成，模态周期: {periods}")
-            except Exception as e:
-                logger.error(f"模态分析失败: {e}", exc_info=True)
-        
-        # 3. 时程分析            
-        if 'time_history' in analysis_types:
-            try:
-                print("运行time_history分析...")
-                # 构建模型（重新构建以确保干净的状态）
-                self.bridge_model.build_in_opensees()
-                
-                gm_config = self.config['analysis']['ground_motion']
-                gm_file = gm_config['file']
-                dt = gm_config['dt']
-                duration = gm_config.get('duration', None)
-                
-                th_results = self.analysis_runner.run_time_history_analysis(
-                    gm_file, dt, analysis_dt=dt/2, total_time=duration
-                )
-                
-                # 提取关键响应指标
-                if len(th_results['displacements']) > 1:
-                    max_disp = np.max(np.abs(th_results['displacements'][:, 1:]), axis=0)
-                    analysis_results['max_displacement'] = max_disp.tolist()
-                    logger.info(f"时程分析完成，最大位移向量: {max_disp}")
-                else:
-                    logger.warning("时程分析完成，但位移结果为空")
+                print(f"运行{name}分析...")
+                # 复用已构建的模型，重置到干净的初始状态
+                self._prepare_model()
+                run(analysis_results)
             except Exception as e:
-                logger.error(f"时程分析失败: {e}", exc_info=True)
+                logger.error("%s分析失败: %s", label, e, exc_info=True)
         
         # 保存分析运行器的完整结果
         self.results['analysis'] = self.analysis_runner.get_results()
@@ -167,9 +255,9 @@ class BridgeEvaluator:
                 self.config['height']
             )
             self.results['damage'] = damage_results
-            logger.info(f"损伤评估完成")
+            logger.info("损伤评估完成")
         except Exception as e:
-            logger.error(f"损伤评估失败: {e}", exc_info=True)
+            logger.error("损伤评估失败: %s", e, exc_info=True)
             self.results['damage'] = {"error": str(e)}
         
         # 4. 汇总结果
@@ -179,7 +267,7 @@ class BridgeEvaluator:
             'total_analysis_time': analysis_time,
             'config': self.config
         }
-        logger.info(f"分析完成，总耗时: {analysis_time:.2f} 秒")
+        logger.info("分析完成，总耗时: %.2f 秒", analysis_time)
         
         # 如果配置要求保存结果
         if self.config.get('output', {}).get('save_results', False):
@@ -188,41 +276,65 @@ class BridgeEvaluator:
         
         return self.results
     
+    def _run_static(self, analysis_results):
+        """运行静态分析"""
+        static_load = self.config['analysis'].get('static_load', 100.0)
+        disp = self.analysis_runner.run_static_analysis(static_load)
+        analysis_results['static_displacement'] = disp
+        logger.info("静态分析完成，最大位移: %s", disp)
+    
+    def _run_modal(self, analysis_results):
+        """运行模态分析"""
+        num_modes = self.config.get('num_modes', 3)
+        periods = self.analysis_runner.run_modal_analysis(num_modes)
+        analysis_results['modal_periods'] = periods
+        logger.info("模态分析完成，模态周期: %s", periods)
+    
+    def _run_time_history(self, analysis_results):
+        """运行时程分析并提取关键响应指标"""
+        gm_config = self.config['analysis']['ground_motion']
+        gm_file = gm_config['file']
+        dt = gm_config['dt']
+        duration = gm_config.get('duration', None)
+        binary = gm_config.get('binary', False)
+        
+        th_results = self.analysis_runner.run_time_history_analysis(
+            gm_file, dt, analysis_dt=dt/2, total_time=duration, binary=binary
+        )
+        
+        # 提取关键响应指标
+        if len(th_results['displacements']) > 1:
+            max_disp = max_abs_over_time(th_results['displacements'])
+            analysis_results['max_displacement'] = max_disp.tolist()
+            logger.info("时程分析完成，最大位移向量: %s", max_disp)
+        else:
+            logger.warning("时程分析完成，但位移结果为空")
+    
     def _save_results(self, filename):
         """保存结果到文件"""
-        # 转换不可JSON序列化的对象
-        def convert_to_serializable(obj):
-            if isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif isinstance(obj, DamageState):
-                return obj.name
-            elif hasattr(obj, '__dict__'):
-                return obj.__dict__
-            else:
-                return str(obj)
-        
-        # 递归处理结果字典
-        def process_dict(d):
-            result = {}
-            for k, v in d.items():
-                if isinstance(v, dict):
-                    result[k] = process_dict(v)
-                elif isinstance(v, list):
-                    result[k] = [convert_to_serializable(item) for item in v]
-                else:
-                    result[k] = convert_to_serializable(v)
-            return result
-            
-        serializable_results = process_dict(self.results)
+        # 损伤结果体量很小，只在这一部分把枚举转换为名称；
+        # 分析结果中的大数组交由 orjson 直接序列化，不再逐元素 tolist()
+        results = dict(self.results)
+        if 'damage' in results:
+            results['damage'] = _damage_state_names(results['damage'])
         
         try:
-            with open(filename, 'w') as f:
-                json.dump(serializable_results, f, indent=2)
+            if orjson is not None:
+                data = orjson.dumps(
+                    results,
+                    default=_json_default,
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2
+                )
+                with open(filename, 'wb') as f:
+                    f.write(data)
+            else:
+                with open(filename, 'w') as f:
+                    json.dump(results, f, indent=2, default=_json_default)
                 
-            logger.info(f"结果已保存到 {filename}")
+            logger.info("结果已保存到 %s", filename)
             print(f"结果已保存到 {filename}")
         except Exception as e:
-            logger.error(f"保存结果时出错: {e}")
+            logger.error("保存结果时出错: %s", e)
     
     def get_damage_summary(self):
         """获取损伤评估摘要"""
@@ -235,26 +347,29 @@ class BridgeEvaluator:
         if 'time_history' in damage_results:
             th_damage = damage_results['time_history']
             
-            if 'error' in th_damage:
-                summary.append(f"损伤评估出错: {th_damage['error']}")
+            if th_damage.error:
+                summary.append(f"损伤评估出错: {th_damage.error}")
                 return "\n".join(summary)
                 
-            overall_state = th_damage['overall_damage_state']
+            overall_state = th_damage.overall_damage_state
             description = self.damage_evaluator.get_damage_description(overall_state)
             
             summary.append(f"整体损伤状态: {overall_state.name}")
             summary.append(f"损伤描述: {description}")
-            summary.append(f"墩柱最大层间位移角: {th_damage['max_pier_drift']:.6f}")
+            summary.append(f"墩柱最大层间位移角: {th_damage.max_pier_drift:.6f}")
+            # 由时程位移直接求墩顶（节点3）与墩底（节点1）x向相对位移角的峰值
+            pier_drift = self.analysis_runner.get_pier_drift(self.config['height'])
+            summary.append(f"墩顶与墩底最大相对位移角: {pier_drift:.6f}")
             
             # 添加墩柱损伤概率
             summary.append("墩柱各损伤状态概率:")
-            for state, prob in th_damage['pier_damage_probabilities'].items():
-                summary.append(f"  - {state}: {prob:.2%}")
+            for state, prob in zip(DamageState, th_damage.pier_damage_probabilities):
+                summary.append(f"  - {state.name}: {prob:.2%}")
                 
             # 添加桥面板损伤概率
             summary.append("桥面板各损伤状态概率:")
-            for state, prob in th_damage['deck_damage_probabilities'].items():
-                summary.append(f"  - {state}: {prob:.2%}")
+            for state, prob in zip(DamageState, th_damage.deck_damage_probabilities):
+                summary.append(f"  - {state.name}: {prob:.2%}")
         elif 'static' in damage_results:
             static_damage = damage_results['static']
             if 'error' in static_damage:
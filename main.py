@@ -4,8 +4,6 @@ from controller.bridge_evaluator import BridgeEvaluator
 import json
 import argparse
 import logging
-from PySide6.QtWidgets import QApplication, QMainWindow
-import ui.MainWindowImpl
 
 
 # 配置日志
@@ -23,8 +21,10 @@ def main():
                       default='all', help='要运行的分析类型')
     parser.add_argument('--debug', '-d', action='store_true',
                       help='启用调试模式')
-    parser.add_argument('--ui', action='store_true', default=True,
+    parser.add_argument('--ui', action='store_true', default=False,
                       help='启动图形界面')
+    parser.add_argument('--no-ui', dest='ui', action='store_false',
+                      help='以命令行模式运行（默认）')
     
     args = parser.parse_args()
     
@@ -35,6 +35,10 @@ def main():
     
     # 如果启用UI，则启动图形界面
     if args.ui:
+        # 仅在需要图形界面时才导入 Qt，命令行模式无需加载 PySide6
+        from PySide6.QtWidgets import QApplication, QMainWindow
+        import ui.MainWindowImpl
+        
         app = QApplication(sys.argv)
         
         # 创建主窗口
@@ -88,7 +92,7 @@ def main():
             result_file = evaluator.config['output'].get('result_file', 'results.json')
             logger.info(f"结果已保存到: {result_file}")
             
-        return evaluator, results
+        return 0
         
     except Exception as e:
         logger.error(f"程序执行过程中出错: {e}", exc_info=True)
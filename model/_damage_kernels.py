@@ -0,0 +1,115 @@
+"""
+损伤评估数值核函数
+
+以 numba 编译（未安装时按普通 Python 执行），供 DamageEvaluator 调用。
+"""
+
+import math
+
+import numpy as np
+
+from model._jit import njit
+
+
+# 不启用 nnan/ninf 快速数学选项：未定义的损伤状态以无穷大中值表示，需要保留对 inf 的判断
+_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def compute_probs(demand, medians, betas):
+    """
+    计算对数正态易损性曲线的超越概率和各损伤状态的条件概率
+    
+    参数:
+        demand: 需求值
+        medians: 各损伤状态（SLIGHT..COMPLETE）的中值，未定义的状态为 inf
+        betas: 各损伤状态的对数标准差
+        
+    返回:
+        (exceed, conditional)，长度分别为 n 和 n+1，conditional[0] 为无损伤概率
+    """
+    n = medians.shape[0]
+    exceed = np.zeros(n)
+    conditional = np.zeros(n + 1)
+    # 非正需求和 NaN 需求均视为无损伤
+    if not demand > 0.0:
+        conditional[0] = 1.0
+        return exceed, conditional
+    
+    for i in range(n):
+        if medians[i] < math.inf:
+            z = math.log(demand / medians[i]) / betas[i]
+            exceed[i] = 0.5 * (1.0 + math.erf(z * 0.7071067811865476))
+    
+    conditional[0] = 1.0 - exceed[0]
+    for i in range(n - 1):
+        conditional[i + 1] = exceed[i] - exceed[i + 1]
+    conditional[n] = exceed[n - 1]
+    return exceed, conditional
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def evaluate_component(demand, thresholds, medians, betas):
+    """
+    一次求出构件的损伤状态和各损伤状态的条件概率
+    
+    参数:
+        demand: 需求值
+        thresholds: 达到各损伤状态的单调不减阈值（SLIGHT..COMPLETE）
+        medians, betas: 易损性参数
+        
+    返回:
+        (state_idx, conditional)，state_idx 即 DamageState 的值；
+        需求为 NaN 时为无损伤，需求为 inf 时为定义了中值的最高损伤状态
+    """
+    state_idx = 0
+    for i in range(thresholds.shape[0]):
+        # 补位为 inf 的未定义状态不参与比较；NaN 与任何阈值比较均为假
+        if thresholds[i] < math.inf and demand >= thresholds[i]:
+            state_idx = i + 1
+    _, conditional = compute_probs(demand, medians, betas)
+    return state_idx, conditional
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def th_kernel(disp, pier_height, pier_thresholds, pier_medians, pier_betas,
+              deck_thresholds, deck_medians, deck_betas):
+    """
+    时程结果损伤评估的数值部分：单次遍历求峰值并确定损伤状态和概率
+    
+    参数:
+        disp: 位移时程数组，至少16列（第4列为墩顶x向位移，第13-15列为桥面中点xyz位移）
+        pier_height: 墩柱高度
+        pier_thresholds, pier_medians, pier_betas: 墩柱层间位移角的损伤阈值和易损性参数
+        deck_thresholds, deck_medians, deck_betas: 桥面板位移的损伤阈值和易损性参数
+        
+    返回:
+        (max_drift, max_deck_disp, pier_idx, pier_conditional, deck_idx, deck_conditional)
+    """
+    max_pier = 0.0
+    max_x = 0.0
+    max_y = 0.0
+    max_z = 0.0
+    for t in range(disp.shape[0]):
+        a = abs(disp[t, 4])
+        if a > max_pier:
+            max_pier = a
+        a = abs(disp[t, 13])
+        if a > max_x:
+            max_x = a
+        a = abs(disp[t, 14])
+        if a > max_y:
+            max_y = a
+        a = abs(disp[t, 15])
+        if a > max_z:
+            max_z = a
+    
+    max_drift = max_pier / pier_height
+    max_deck_disp = np.empty(3)
+    max_deck_disp[0] = max_x
+    max_deck_disp[1] = max_y
+    max_deck_disp[2] = max_z
+    
+    pier_idx, pier_conditional = evaluate_component(max_drift, pier_thresholds, pier_medians, pier_betas)
+    deck_idx, deck_conditional = evaluate_component(max_y, deck_thresholds, deck_medians, deck_betas)
+    return max_drift, max_deck_disp, pier_idx, pier_conditional, deck_idx, deck_conditional
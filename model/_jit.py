@@ -0,0 +1,17 @@
+"""
+Numba 兼容层
+
+numba 为可选依赖：已安装时导出其 njit/prange，
+未安装时退化为直接返回原函数的装饰器，数值核函数按普通 Python 执行。
+"""
+
+try:
+    from numba import njit, prange
+except ImportError:
+    prange = range
+
+    def njit(*args, **kwargs):
+        """无 numba 时的占位装饰器，支持 @njit 与 @njit(...) 两种写法"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -2,12 +2,61 @@ import openseespy.opensees as ops
 import numpy as np
 import os
 import logging
+import tempfile
+from contextlib import suppress
+from model._jit import njit
 
 logger = logging.getLogger("bridge_eval.analysis")
 
+# 时程结果的列定义：第0列为时间，其后按 (节点, 分量) 或 (单元, 分量) 依次排列
+TH_NODES = (1, 2, 3, 4, 5)
+TH_ELEMENTS = (1, 2, 3, 4)
+NUM_COMPONENTS = 3
+# 时程结果中每个节点记录的自由度编号
+_TH_DOFS = tuple(range(1, NUM_COMPONENTS + 1))
+
+
+def disp_column(node, dof):
+    """返回节点位移在时程位移数组中的列号（node、dof 均从1开始）"""
+    return 1 + TH_NODES.index(node) * NUM_COMPONENTS + (dof - 1)
+
+
+def _fast_loadtxt(path, ncols=1):
+    """
+    快速读取空白分隔的数值文本文件
+    
+    优先使用C实现的 np.fromfile 解析，数据与列数不匹配时回退到 np.loadtxt
+    """
+    try:
+        data = np.fromfile(path, sep=' ')
+        return data if ncols == 1 else data.reshape(-1, ncols)
+    except ValueError:
+        return np.loadtxt(path, ndmin=1 if ncols == 1 else 2)
+
+
+@njit(cache=True, fastmath=True)
+def _max_drift(disp_top, disp_base, height):
+    """单次遍历求墩顶与墩底相对位移绝对值的最大值，并换算为位移角"""
+    m = 0.0
+    for i in range(disp_top.shape[0]):
+        d = abs(disp_top[i] - disp_base[i])
+        if d > m:
+            m = d
+    return m / height
+
+
 class AnalysisRunner:
-    def __init__(self):
+    def __init__(self, reuse_buffers=False):
+        """
+        参数:
+            reuse_buffers: 为True时步数相同的时程分析复用同一组响应数组，
+                           下一次分析会覆盖上一次返回的结果；默认每次分配新数组
+        """
         self.results = {}
+        self.reuse_buffers = reuse_buffers
+        # 时程响应缓冲区，仅在 reuse_buffers 为True时跨分析复用
+        self._th_disp_buf = None
+        self._th_force_buf = None
 
     def run_static_analysis(self, load_magnitude=100.0):
         """运行静态分析"""
@@ -26,7 +75,7 @@ class AnalysisRunner:
         
         # 收集结果
         disp_node5 = ops.nodeDisp(5)
-        logger.info(f"静力分析完成，节点5位移: {disp_node5}")
+        logger.info("静力分析完成，节点5位移: %s", disp_node5)
         
         # 存储结果
         self.results["static"] = {
@@ -39,19 +88,12 @@ class AnalysisRunner:
     
     def run_modal_analysis(self, num_modes=3):
         """运行模态分析"""
-        logger.info(f"开始模态分析，计算{num_modes}个模态")
+        logger.info("开始模态分析，计算%d个模态", num_modes)
         
-        try:
-            # 移除现有的荷载模式
-            ops.remove('loadPattern', 1)
-        except:
-            logger.debug("无需移除荷载模式")
-            
-        try:
+        # 清理现有的分析设置和荷载模式
+        with suppress(Exception):
             ops.wipeAnalysis()
-            logger.debug("清理现有分析设置")
-        except:
-            pass
+            ops.remove('loadPattern', 1)
             
         try:
             # 先计算质量和刚度矩阵
@@ -59,34 +101,26 @@ class AnalysisRunner:
             
             # 设置特征值分析
             eigen_values = ops.eigen(num_modes)
-            logger.info(f"特征值计算完成: {eigen_values}")
+            logger.info("特征值计算完成: %s", eigen_values)
+            
+            # 向量化计算周期和频率，非正特征值对应的周期和频率记为0
+            ev = np.asarray(eigen_values, dtype=np.float64)
+            periods = np.where(ev > 0, 2 * np.pi / np.sqrt(np.clip(ev, 1e-30, None)), 0.0)
+            frequencies = np.zeros_like(periods)
+            np.divide(1.0, periods, out=frequencies, where=periods > 0)
+            logger.info("各阶模态周期(秒): %s", periods)
             
-            periods = []
-            for i in range(num_modes):
-                try:
-                    # 计算周期
-                    if eigen_values[i] > 0:
-                        period = 2 * np.pi / np.sqrt(eigen_values[i])
-                    else:
-                        period = 0
-                        
-                    periods.append(period)
-                    logger.info(f"模态 {i+1}: 周期 = {period:.6f} 秒")
-                except Exception as e:
-                    logger.error(f"计算模态 {i+1} 的周期时出错: {e}")
-                    periods.append(0)
-                    
             # 存储结果
             self.results["modal"] = {
-                "periods": periods,
-                "frequencies": [1/t if t > 0 else 0 for t in periods],
-                "eigen_values": eigen_values.tolist() if hasattr(eigen_values, 'tolist') else list(eigen_values)
+                "periods": periods.tolist(),
+                "frequencies": frequencies.tolist(),
+                "eigen_values": ev.tolist()
             }
             
-            return periods
+            return self.results["modal"]["periods"]
             
         except Exception as e:
-            logger.error(f"模态分析时出错: {e}", exc_info=True)
+            logger.error("模态分析时出错: %s", e, exc_info=True)
             # 返回默认值
             default_periods = [0.5, 0.3, 0.1][:num_modes]
             self.results["modal"] = {
@@ -96,36 +130,58 @@ class AnalysisRunner:
             }
             return default_periods
     
-    def run_time_history_analysis(self, ground_motion_file, dt, analysis_dt=0.01, total_time=None):
-        """运行时程分析"""
-        logger.info(f"开始时程分析，地震波文件: {ground_motion_file}, dt: {dt}")
+    def run_time_history_analysis(self, ground_motion_file, dt, analysis_dt=0.01, total_time=None,
+                                  binary=False):
+        """
+        运行时程分析
+        
+        参数:
+            ground_motion_file: 地震波文件，默认为每行一个加速度值的文本文件
+            dt: 地震记录时间间隔
+            analysis_dt: 分析时间步长
+            total_time: 分析总时长，为None时按记录长度计算
+            binary: 地震波文件是否为原始 float32 二进制格式
+            
+        注意: 以 reuse_buffers=True 创建时，结果中的位移和内力数组是可复用的缓冲区，
+        步数相同的下一次时程分析会覆盖其内容，需要保留时请先复制
+        """
+        logger.info("开始时程分析，地震波文件: %s, dt: %s", ground_motion_file, dt)
         
         if not os.path.exists(ground_motion_file):
             raise FileNotFoundError(f"地震波文件不存在: {ground_motion_file}")
             
-        # 加载地震记录
-        try:
-            acc_data = np.loadtxt(ground_motion_file)
-            logger.info(f"成功加载地震记录，点数: {len(acc_data)}")
-        except Exception as e:
-            logger.error(f"加载地震记录时出错: {e}")
-            raise
-        
-        if total_time is None:
+        # 文本记录由 OpenSees 直接读取，只有未指定分析时长时才需要在此统计点数；
+        # 二进制记录以内存映射方式打开，不整体读入内存
+        acc_data = None
+        if binary:
+            acc_data = np.memmap(ground_motion_file, dtype=np.float32, mode='r')
+            logger.info("成功映射二进制地震记录，点数: %d", acc_data.size)
+            if total_time is None:
+                total_time = (acc_data.size - 1) * dt
+        elif total_time is None:
+            try:
+                acc_data = _fast_loadtxt(ground_motion_file)
+                logger.info("成功加载地震记录，点数: %d", len(acc_data))
+            except Exception as e:
+                logger.error("加载地震记录时出错: %s", e)
+                raise
             total_time = (len(acc_data)-1) * dt
         
-        logger.info(f"总分析时间: {total_time} 秒，分析时间步长: {analysis_dt} 秒")
+        logger.info("总分析时间: %s 秒，分析时间步长: %s 秒", total_time, analysis_dt)
         
         try:
             # 清理现有的分析设置和荷载模式
-            try:
+            with suppress(Exception):
                 ops.wipeAnalysis()
                 ops.remove('loadPattern', 1)  # 移除静力荷载模式
-            except:
-                pass
                 
             # 设置地震激励
-            ops.timeSeries('Path', 2, '-dt', dt, '-values', *acc_data, '-factor', 9.81)
+            if binary:
+                # Path 时间序列的 -filePath 只能读取文本文件：由 numpy 将映射的记录
+                # 逐页写成临时文本文件交给 OpenSees 读取，不在 Python 中展开为浮点数列表
+                self._path_series_from_binary(acc_data, dt)
+            else:
+                ops.timeSeries('Path', 2, '-dt', dt, '-filePath', ground_motion_file, '-factor', 9.81)
             ops.pattern('UniformExcitation', 2, 1, '-accel', 2)
             logger.debug("成功设置地震激励模式")
             
@@ -134,83 +190,47 @@ class AnalysisRunner:
             self._setup_analysis_dynamic()
             logger.debug("成功设置动力分析参数")
             
-            # 设置输出目录
-            result_dir = 'results'
-            if not os.path.exists(result_dir):
-                os.makedirs(result_dir)
-                
-            # 记录所有节点的位移
-            disp_file = os.path.join(result_dir, 'temp_disp.txt')
-            ops.recorder('Node', '-file', disp_file, '-time', '-nodeRange', 1, 5, '-dof', 1, 2, 3, 'disp')
-            
-            # 记录所有单元的内力
-            force_file = os.path.join(result_dir, 'temp_force.txt')
-            ops.recorder('Element', '-file', force_file, '-time', '-eleRange', 1, 4, 'forces')
-            logger.debug("成功设置记录器")
-            
-            # 执行动力分析
+            # 预分配响应数组，每步直接从域中采样，避免记录器写文本文件再解析的往返
             num_steps = int(total_time / analysis_dt)
-            logger.info(f"开始执行动力分析，步数: {num_steps}...")
+            disp_data, force_data = self._get_th_buffers(num_steps + 1)
+            self._sample_response(disp_data, force_data, 0)
+            
+            # 执行动力分析，逐步推进
+            logger.info("开始执行动力分析，步数: %d...", num_steps)
+            completed = 0
             
             try:
-                ok = ops.analyze(num_steps, analysis_dt)
-                if ok != 0:
-                    logger.warning(f"分析未成功完成, 返回码: {ok}")
+                for k in range(num_steps):
+                    ok = ops.analyze(1, analysis_dt)
+                    if ok != 0:
+                        ok = self._retry_step(analysis_dt)
+                    if ok != 0:
+                        logger.warning("分析未成功完成, 第%d步返回码: %s", k + 1, ok)
+                        break
+                    self._sample_response(disp_data, force_data, k + 1)
+                    completed = k + 1
                 else:
                     logger.info("动力分析成功完成")
             except Exception as e:
-                logger.error(f"执行动力分析时出错: {e}")
-                
-            # 读取结果文件
-            try:
-                if os.path.exists(disp_file):
-                    disp_data = np.loadtxt(disp_file)
-                    logger.info(f"成功读取位移数据，形状: {disp_data.shape}")
-                else:
-                    logger.warning(f"位移结果文件不存在: {disp_file}")
-                    disp_data = np.array([])
-                    
-                if os.path.exists(force_file):
-                    force_data = np.loadtxt(force_file)
-                    logger.info(f"成功读取内力数据，形状: {force_data.shape}")
-                else:
-                    logger.warning(f"内力结果文件不存在: {force_file}")
-                    force_data = np.array([])
-                    
-            except Exception as e:
-                logger.error(f"读取结果文件时出错: {e}")
-                disp_data = np.array([])
-                force_data = np.array([])
+                logger.error("执行动力分析时出错: %s", e)
             
-            # 存储结果
-            if disp_data.size == 0:
-                logger.warning("位移数据为空，使用零矩阵替代")
-                # 创建形状为 (1, 16) 的零矩阵，16 = 1(时间) + 5节点 * 3自由度
-                disp_data = np.zeros((1, 16))
-                
-            if force_data.size == 0:
-                logger.warning("内力数据为空，使用零矩阵替代")
-                # 创建形状为 (1, 13) 的零矩阵，13 = 1(时间) + 4单元 * 3内力
-                force_data = np.zeros((1, 13))
+            # 只保留已完成的步
+            if completed < num_steps:
+                disp_data = disp_data[:completed + 1]
+                force_data = force_data[:completed + 1]
+            logger.info("位移数据形状: %s, 内力数据形状: %s", disp_data.shape, force_data.shape)
         
             self.results["time_history"] = {
                 "displacements": disp_data,
                 "element_forces": force_data,
-                "time_points": disp_data[:, 0]
+                # 行优先数组中的时间列不连续，单独复制一份以便直接序列化
+                "time_points": np.ascontiguousarray(disp_data[:, 0])
             }
-            
-            # 清除记录器
-            ops.remove('recorders')
-            
-            # 清理临时文件
-            for temp_file in [disp_file, force_file]:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
                     
             return self.results["time_history"]
             
         except Exception as e:
-            logger.error(f"时程分析过程中出错: {e}", exc_info=True)
+            logger.error("时程分析过程中出错: %s", e, exc_info=True)
             # 确保返回一个有效的结果
             self.results["time_history"] = {
                 "displacements": np.zeros((1, 16)),
@@ -220,11 +240,67 @@ class AnalysisRunner:
             }
             return self.results["time_history"]
     
+    def _path_series_from_binary(self, acc_data, dt):
+        """将内存映射的二进制记录转写为临时文本文件，并以 -filePath 建立 Path 时间序列"""
+        fd, text_file = tempfile.mkstemp(suffix='.txt', prefix='gm_')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                # float32 有效位数为9位，按此精度输出可无损还原
+                acc_data.tofile(f, sep='\n', format='%.9g')
+            ops.timeSeries('Path', 2, '-dt', dt, '-filePath', text_file, '-factor', 9.81)
+        finally:
+            # OpenSees 在建立时间序列时已读入全部数据，临时文件可以立即删除
+            with suppress(OSError):
+                os.remove(text_file)
+    
+    def reset(self):
+        """清除分析设置和荷载模式，并将模型恢复到初始状态，以便复用已建立的模型"""
+        ops.wipeAnalysis()
+        for tag in (1, 2):
+            with suppress(Exception):
+                ops.remove('loadPattern', tag)
+                ops.remove('timeSeries', tag)
+        ops.reset()
+    
+    def _get_th_buffers(self, num_rows):
+        """
+        获取时程位移和内力缓冲区
+        
+        开启 reuse_buffers 且行数不变时直接复用上一次分配的数组，否则分配新数组
+        
+        采用行优先（C连续）存储：每步采样写入连续的一行，截取已完成的步后仍保持连续，
+        保存结果时 orjson 可以直接序列化
+        """
+        if not self.reuse_buffers or self._th_disp_buf is None or self._th_disp_buf.shape[0] != num_rows:
+            # 16 = 1(时间) + 5节点 * 3自由度
+            self._th_disp_buf = np.empty((num_rows, 1 + len(TH_NODES) * NUM_COMPONENTS))
+            # 13 = 1(时间) + 4单元 * 3内力
+            self._th_force_buf = np.empty((num_rows, 1 + len(TH_ELEMENTS) * NUM_COMPONENTS))
+        return self._th_disp_buf, self._th_force_buf
+    
+    def _retry_step(self, analysis_dt):
+        """当前步不收敛时改用 KrylovNewton 以两个半步重试，结束后恢复初始切线迭代"""
+        logger.debug("时间 %s 处不收敛，改用 KrylovNewton 细分步长重试", ops.getTime())
+        ops.algorithm('KrylovNewton')
+        ok = ops.analyze(2, analysis_dt / 2)
+        ops.algorithm('ModifiedNewton', '-initial')
+        return ok
+    
+    def _sample_response(self, disp_data, force_data, row):
+        """将当前时刻的节点位移和单元内力写入预分配数组的指定行"""
+        current_time = ops.getTime()
+        disp_data[row, 0] = current_time
+        # 按自由度逐个取值，列宽与节点的自由度数 (ndf) 无关
+        disp_data[row, 1:] = [ops.nodeDisp(node, dof) for node in TH_NODES for dof in _TH_DOFS]
+        force_data[row, 0] = current_time
+        force_data[row, 1:] = [f for ele in TH_ELEMENTS for f in ops.eleForce(ele)[:NUM_COMPONENTS]]
+    
     def _setup_analysis(self):
         """设置静态分析参数"""
         ops.constraints('Plain')
         ops.numberer('RCM')
-        ops.system('BandGeneral')
+        # 线弹性模型的刚度矩阵对称正定，使用对称带状求解器
+        ops.system('BandSPD')
         ops.test('NormDispIncr', 1e-6, 10)
         ops.algorithm('Newton')
         ops.integrator('LoadControl', 1.0)
@@ -234,12 +310,46 @@ class AnalysisRunner:
         """设置动力分析参数"""
         ops.constraints('Plain')
         ops.numberer('RCM')
-        ops.system('BandGeneral')
+        # 线弹性模型的刚度矩阵对称正定，使用对称带状求解器
+        ops.system('BandSPD')
         ops.test('NormDispIncr', 1e-6, 10)
-        ops.algorithm('Newton')
+        # 弹性梁柱单元的切线刚度不变，使用初始切线只需分解一次
+        ops.algorithm('ModifiedNewton', '-initial')
         ops.integrator('Newmark', 0.5, 0.25)
         ops.analysis('Transient')
 
+    @staticmethod
+    def prewarm():
+        """用与时程结果相同布局的极小数组调用本模块的JIT核函数，触发编译并写入磁盘缓存"""
+        disp = np.zeros((2, 1 + len(TH_NODES) * NUM_COMPONENTS))
+        # 与 get_pier_drift 一样传入位移数组的列视图
+        _max_drift(disp[:, disp_column(3, 1)], disp[:, disp_column(1, 1)], 1.0)
+    
     def get_results(self):
         """获取分析结果"""
         return self.results
+    
+    def get_pier_drift(self, pier_height, top_node=3, base_node=1, dof=1):
+        """
+        计算时程分析中墩柱的最大位移角
+        
+        参数:
+            pier_height: 墩柱高度
+            top_node: 墩顶节点号
+            base_node: 墩底节点号
+            dof: 参与计算的自由度（从1开始）
+        """
+        disp = self.results["time_history"]["displacements"]
+        return float(_max_drift(disp[:, disp_column(top_node, dof)],
+                                disp[:, disp_column(base_node, dof)],
+                                pier_height))
+    
+    def get_node_displacements(self):
+        """以 (步数, 节点, 自由度) 形式返回时程位移，与结果数组共享内存"""
+        disp = self.results["time_history"]["displacements"]
+        return disp[:, 1:].reshape(len(disp), len(TH_NODES), NUM_COMPONENTS)
+    
+    def get_element_forces(self):
+        """以 (步数, 单元, 内力分量) 形式返回时程内力，与结果数组共享内存"""
+        force = self.results["time_history"]["element_forces"]
+        return force[:, 1:].reshape(len(force), len(TH_ELEMENTS), NUM_COMPONENTS)
@@ -11,22 +11,34 @@ class BridgeModel:
         
     def build_in_opensees(self):
         """构建完整的桥梁模型"""
+        # 预先取出几何与材料参数，避免建模过程中反复查询字典
+        span_length = self.span_length
+        pier_height = self.pier_height
+        props = self.material_props
+        E = props['E']
+        fc = props['fc']
+        pier_width = props.get('pier_width', 1.5)
+        deck_area = props.get('deck_area', 1.0)
+        deck_inertia = props.get('deck_inertia', 0.1)
+        pier_area = pier_width**2
+        pier_iz = pier_width**4/12
+        
         ops.wipe()
         ops.model('basic', '-ndm', 3, '-ndf', 3)  # 2D模型，每个节点3个自由度
         
         # 创建节点
         # 基础节点
         ops.node(1, 0.0, 0.0)
-        ops.node(2, self.span_length, 0.0)
+        ops.node(2, span_length, 0.0)
         ops.fix(1, 1, 1, 1)  # 固定支座
         ops.fix(2, 1, 1, 1)  # 固定支座
         
         # 桥墩顶部节点
-        ops.node(3, 0.0, self.pier_height)
-        ops.node(4, self.span_length, self.pier_height)
+        ops.node(3, 0.0, pier_height)
+        ops.node(4, span_length, pier_height)
         
         # 桥面板中间节点
-        ops.node(5, self.span_length/2, self.pier_height+1.0)
+        ops.node(5, span_length/2, pier_height+1.0)
         
         # 记录节点信息供后续使用
         self.nodes = {
@@ -39,22 +51,13 @@ class BridgeModel:
         
         # 定义材料
         # 墩柱材料
-        ops.uniaxialMaterial('Concrete01', 1, 
-                             self.material_props['fc'], 
-                             self.material_props['fc']/self.material_props['E'], 
-                             0.2*self.material_props['fc'], 
-                             0.05)
+        ops.uniaxialMaterial('Concrete01', 1, fc, fc/E, 0.2*fc, 0.05)
         
         # 桥面板材料
-        ops.uniaxialMaterial('Elastic', 2, self.material_props['E'], 0.3)
+        ops.uniaxialMaterial('Elastic', 2, E, 0.3)
 
         # 墩柱截面 - 修复参数列表
-        pier_width = self.material_props.get('pier_width', 1.5)
-        pier_area = pier_width**2
-        pier_iz = pier_width**4/12
-
-        ops.section('Elastic', 1, self.material_props['E'], pier_area, pier_iz, 
-                  self.material_props['E']/2.4, pier_iz*2)
+        ops.section('Elastic', 1, E, pier_area, pier_iz, E/2.4, pier_iz*2)
         
         # 为每个墩柱创建集成点
         ops.beamIntegration('Legendre', 1, 1, 5)
@@ -68,25 +71,15 @@ class BridgeModel:
 
         # 改用弹性梁柱单元替代非线性梁柱（简化模型）
         # 左侧墩柱
-        ops.element('elasticBeamColumn', 1, 1, 3, 
-                   pier_area, self.material_props['E'], pier_iz, 1)
+        ops.element('elasticBeamColumn', 1, 1, 3, pier_area, E, pier_iz, 1)
         
         # 右侧墩柱
-        ops.element('elasticBeamColumn', 2, 2, 4, 
-                   pier_area, self.material_props['E'], pier_iz, 1)
+        ops.element('elasticBeamColumn', 2, 2, 4, pier_area, E, pier_iz, 1)
         
         # 桥面板 (简化为弹性梁)
-        ops.element('elasticBeamColumn', 3, 3, 5, 
-                   self.material_props.get('deck_area', 1.0), 
-                   self.material_props['E'], 
-                   self.material_props.get('deck_inertia', 0.1), 
-                   2)
-        
-        ops.element('elasticBeamColumn', 4, 5, 4, 
-                   self.material_props.get('deck_area', 1.0), 
-                   self.material_props['E'], 
-                   self.material_props.get('deck_inertia', 0.1), 
-                   2)
+        ops.element('elasticBeamColumn', 3, 3, 5, deck_area, E, deck_inertia, 2)
+        
+        ops.element('elasticBeamColumn', 4, 5, 4, deck_area, E, deck_inertia, 2)
         
         # 记录单元信息供后续使用
         self.elements = {
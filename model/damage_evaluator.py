@@ -1,6 +1,24 @@
+import logging
+import math
 import numpy as np
+from dataclasses import dataclass
 from enum import Enum
 
+from model._damage_kernels import evaluate_component, th_kernel
+
+_INV_SQRT2 = 0.7071067811865476  # 1/sqrt(2)
+
+try:
+    from scipy.special import ndtr
+except ImportError:  # scipy 为可选依赖，缺失时逐元素调用 math.erf
+    _erf = np.vectorize(math.erf, otypes=[float])
+
+    def ndtr(x):
+        """标准正态分布累积分布函数（数组版）"""
+        return 0.5 * (1.0 + _erf(np.asarray(x) * _INV_SQRT2))
+
+logger = logging.getLogger("bridge_eval.damage")
+
 class DamageState(Enum):
     """桥梁损伤状态枚举"""
     NO_DAMAGE = 0       # 无损伤
@@ -9,17 +27,88 @@ class DamageState(Enum):
     EXTENSIVE = 3       # 严重损伤
     COMPLETE = 4        # 完全损伤/倒塌
 
+# 按损伤程度排列的状态列表及名称，列表下标即 DamageState 的值
+_STATES_LIST = list(DamageState)
+_STATE_NAMES = tuple(state.name for state in _STATES_LIST)
+
+@dataclass(init=False)
+class TimeHistoryResult:
+    """
+    时程分析的损伤评估结果
+    
+    各损伤状态概率以长度为5的数组存储，下标为 DamageState 的值；
+    默认值即无效结果（无损伤、概率全为0）
+    """
+    # 显式声明 __slots__（dataclass 的 slots 参数需要 Python 3.10），
+    # 字段因此不能带类属性默认值，默认值放在 __init__ 中
+    __slots__ = ("max_pier_drift", "max_deck_displacement", "pier_damage_state", "deck_damage_state",
+                 "overall_damage_state", "pier_damage_probabilities", "deck_damage_probabilities", "error")
+    
+    max_pier_drift: float
+    max_deck_displacement: np.ndarray
+    pier_damage_state: DamageState
+    deck_damage_state: DamageState
+    overall_damage_state: DamageState
+    pier_damage_probabilities: np.ndarray
+    deck_damage_probabilities: np.ndarray
+    error: str
+    
+    def __init__(self, max_pier_drift=0.0, max_deck_displacement=None,
+                 pier_damage_state=DamageState.NO_DAMAGE, deck_damage_state=DamageState.NO_DAMAGE,
+                 overall_damage_state=DamageState.NO_DAMAGE, pier_damage_probabilities=None,
+                 deck_damage_probabilities=None, error=""):
+        self.max_pier_drift = max_pier_drift
+        self.max_deck_displacement = np.zeros(3) if max_deck_displacement is None else max_deck_displacement
+        self.pier_damage_state = pier_damage_state
+        self.deck_damage_state = deck_damage_state
+        self.overall_damage_state = overall_damage_state
+        self.pier_damage_probabilities = (np.zeros(len(_STATES_LIST)) if pier_damage_probabilities is None
+                                          else pier_damage_probabilities)
+        self.deck_damage_probabilities = (np.zeros(len(_STATES_LIST)) if deck_damage_probabilities is None
+                                          else deck_damage_probabilities)
+        self.error = error
+    
+    def to_dict(self):
+        """转换为以字符串为键的字典，概率按损伤状态名称展开（用于保存结果）"""
+        result = {
+            "max_pier_drift": self.max_pier_drift,
+            "max_deck_displacement": self.max_deck_displacement,
+            "pier_damage_state": self.pier_damage_state,
+            "deck_damage_state": self.deck_damage_state,
+            "overall_damage_state": self.overall_damage_state,
+            "pier_damage_probabilities": dict(zip(_STATE_NAMES, self.pier_damage_probabilities.tolist())),
+            "deck_damage_probabilities": dict(zip(_STATE_NAMES, self.deck_damage_probabilities.tolist()))
+        }
+        if self.error:
+            result["error"] = self.error
+        return result
+
 class DamageEvaluator:
     """桥梁损伤评估器"""
     
-    def __init__(self, fragility_params=None):
+    def __init__(self, fragility_params=None, verbose=False, use_float32=False, reuse_output=False):
         """
         初始化损伤评估器
         
         参数:
             fragility_params: 易损性曲线参数字典，包含各损伤状态的中值和对数标准差
                              如果为None则使用默认参数
+            verbose: 评估出错时是否在日志中输出完整的异常堆栈
+            use_float32: 为True时 float32 的时程位移直接交给核函数，不再转换为 float64
+                         （位移阈值为毫米级，单精度足够，可减半内存带宽）；
+                         float64 输入始终按原样读取，不做降精度转换
+            reuse_output: 是否在多次评估之间复用结果字典和时程结果对象（用于蒙特卡洛等
+                          循环调用），启用后每次评估都会覆盖上一次返回的结果
         """
+        self.verbose = verbose
+        self.use_float32 = use_float32
+        self.reuse_output = reuse_output
+        
+        # 按用途缓存的临时数组（填充、类型转换），形状和类型不变时在多次评估之间复用
+        self._scratch = {}
+        self._output = {}
+        self._th_output = TimeHistoryResult()
+        
         # 默认的易损性曲线参数 (单位: 米，基于位移)
         self.default_fragility = {
             "pier_drift": {  # 墩柱层间位移角
@@ -37,6 +126,39 @@ class DamageEvaluator:
         }
         
         self.fragility_params = fragility_params if fragility_params else self.default_fragility
+        
+        # 将各构件的易损性参数整理为按损伤状态排列的数组（SLIGHT..COMPLETE），
+        # 未定义的损伤状态中值取无穷大，其超越概率恒为0
+        self._medians = {}
+        self._betas = {}
+        for component_type, fragility in self.fragility_params.items():
+            params = [fragility.get(state) for state in _STATES_LIST[1:]]
+            self._medians[component_type] = np.array(
+                [p["median"] if p else np.inf for p in params], dtype=float)
+            self._betas[component_type] = np.array(
+                [p["beta"] if p else 1.0 for p in params], dtype=float)
+        
+        # 达到某损伤状态的阈值取该状态及更高状态中值的最小值，得到单调不减的阈值数组，
+        # searchsorted 返回的插入位置即为 DamageState 的值；
+        # 存为连续数组，使JIT核函数的调用签名与预热时一致
+        self._sorted_medians = {
+            component_type: np.ascontiguousarray(np.minimum.accumulate(medians[::-1])[::-1])
+            for component_type, medians in self._medians.items()
+        }
+        # 定义了中值的最高损伤状态：阈值中只有末尾的未定义状态为 inf，有限阈值的个数即其 DamageState 值
+        self._max_state_idx = {
+            component_type: int(np.isfinite(thresholds).sum())
+            for component_type, thresholds in self._sorted_medians.items()
+        }
+    
+    @staticmethod
+    def prewarm():
+        """用与实际评估相同类型和布局的极小输入调用损伤评估核函数，触发编译并写入磁盘缓存"""
+        # 时程位移为C连续的 float64 二维数组，阈值和易损性参数为连续的 float64 一维数组
+        disp = np.zeros((2, 16))
+        params = np.ones(len(_STATES_LIST) - 1)
+        evaluate_component(1.0, params, params, params)
+        th_kernel(disp, 1.0, params, params, params, params, params, params)
     
     def evaluate_damage_from_results(self, analysis_results, pier_height):
         """
@@ -49,18 +171,23 @@ class DamageEvaluator:
         返回:
             包含损伤状态和概率的字典
         """
-        damage_result = {}
+        if self.reuse_output:
+            damage_result = self._output
+            damage_result.clear()
+        else:
+            damage_result = {}
         
         # 评估静力分析结果
         if "static" in analysis_results:
             try:
-                static_disp = analysis_results["static"]["displacements"]["node5"][1]  # 竖向位移
+                # 竖向位移，转换为 Python 浮点数后全程按标量计算
+                static_disp = float(analysis_results["static"]["displacements"]["node5"][1])
                 damage_result["static"] = {
                     "deck_displacement": static_disp,
-                    "damage_state": self._evaluate_damage_state("deck_disp", abs(static_disp))
+                    "damage_state": self._evaluate_damage_state("deck_disp", math.fabs(static_disp))
                 }
-            except (KeyError, IndexError, TypeError) as e:
-                print(f"处理静力分析结果时出错: {e}")
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                logger.error("处理静力分析结果时出错: %s", e, exc_info=self.verbose)
                 damage_result["static"] = {
                     "deck_displacement": 0.0,
                     "damage_state": DamageState.NO_DAMAGE,
@@ -74,79 +201,84 @@ class DamageEvaluator:
                 
                 if len(th_results["displacements"]) <= 1:
                     # 没有有效结果
-                    damage_result["time_history"] = {
-                        "max_pier_drift": 0.0,
-                        "max_deck_displacement": [0.0, 0.0, 0.0],
-                        "pier_damage_state": DamageState.NO_DAMAGE,
-                        "deck_damage_state": DamageState.NO_DAMAGE,
-                        "overall_damage_state": DamageState.NO_DAMAGE,
-                        "pier_damage_probabilities": {state.name: 0.0 for state in DamageState},
-                        "deck_damage_probabilities": {state.name: 0.0 for state in DamageState},
-                        "error": "时程分析结果无效或为空"
-                    }
+                    damage_result["time_history"] = TimeHistoryResult(error="时程分析结果无效或为空")
                     return damage_result
                 
                 # 设置列索引，根据节点和自由度
                 # 假设结果格式: 时间, 节点1-x, 节点1-y, 节点1-z, 节点2-x, ...
                 # 检查维度是否足够
-                if th_results["displacements"].shape[1] < 16:
-                    print(f"警告: 位移数据列数不足, 实际: {th_results['displacements'].shape[1]}, 预期: 16")
-                    # 使用零数组填充
-                    disp_array = np.zeros((len(th_results["displacements"]), 16))
-                    disp_array[:, :min(16, th_results["displacements"].shape[1])] = th_results["displacements"][:, :min(16, th_results["displacements"].shape[1])]
+                disp_array = th_results["displacements"]
+                # 只有输入本身为 float32 时才走单精度路径，避免为降精度复制整个数组
+                if self.use_float32 and disp_array.dtype == np.float32:
+                    dtype = np.float32
                 else:
-                    disp_array = th_results["displacements"]
-                
-                # 节点3 (左墩顶) 的x方向位移: 索引应该是1+3*3-3=7 (时间是索引0)
-                node3_disp_x = disp_array[:, 4]  # 1+节点*3+自由度
-                
-                # 节点5 (桥面中点) 的xyz位移: 索引应该是 1+5*3-3=13, 14, 15
-                deck_disp = disp_array[:, 13:16]
+                    dtype = np.float64
+                num_cols = disp_array.shape[1]
+                if num_cols < 16:
+                    logger.warning("位移数据列数不足, 实际: %d, 预期: 16", num_cols)
+                    # 使用零列填充，同时完成类型转换
+                    padded = self._scratch_buffer("pad", (disp_array.shape[0], 16), dtype)
+                    padded[:, :num_cols] = disp_array
+                    padded[:, num_cols:] = 0.0
+                    disp_array = padded
                 
-                # 计算最大值
-                max_deck_disp = np.max(np.abs(deck_disp), axis=0) if deck_disp.shape[0] > 0 else np.zeros(3)
-                max_drift = np.max(np.abs(node3_disp_x)) / pier_height if len(node3_disp_x) > 0 else 0.0
+                # 仅在非连续或数据类型不符时复制；分析器输出的连续数组可直接使用
+                flags = disp_array.flags
+                if not (flags.c_contiguous or flags.f_contiguous) or disp_array.dtype != dtype:
+                    converted = self._scratch_buffer("cast", disp_array.shape, dtype)
+                    np.copyto(converted, disp_array)
+                    disp_array = converted
                 
-                # 评估墩柱损伤
-                pier_damage_state = self._evaluate_damage_state("pier_drift", max_drift)
+                # 单次遍历求墩顶x向位移 (索引4, 1+节点*3+自由度) 和桥面中点xyz位移 (索引13, 14, 15)
+                # 的绝对值峰值，并同时确定墩柱和桥面板的损伤状态及概率
+                max_drift, max_deck_disp, pier_idx, pier_damage_probs, deck_idx, deck_damage_probs = th_kernel(
+                    disp_array, float(pier_height),
+                    self._sorted_medians["pier_drift"], self._medians["pier_drift"], self._betas["pier_drift"],
+                    self._sorted_medians["deck_disp"], self._medians["deck_disp"], self._betas["deck_disp"])
                 
-                # 评估桥面板损伤
-                deck_damage_state = self._evaluate_damage_state("deck_disp", max_deck_disp[1])
+                pier_damage_state = _STATES_LIST[pier_idx]
+                deck_damage_state = _STATES_LIST[deck_idx]
                 
                 # 整体损伤取两者的最大值
-                overall_damage = max(pier_damage_state, deck_damage_state, key=lambda x: x.value)
+                overall_damage = _STATES_LIST[max(pier_idx, deck_idx)]
                 
-                # 计算各损伤状态的概率
-                pier_damage_probs = self._calculate_damage_probabilities("pier_drift", max_drift)
-                deck_damage_probs = self._calculate_damage_probabilities("deck_disp", max_deck_disp[1])
-                
-                damage_result["time_history"] = {
-                    "max_pier_drift": max_drift,
-                    "max_deck_displacement": max_deck_disp,
-                    "pier_damage_state": pier_damage_state,
-                    "deck_damage_state": deck_damage_state,
-                    "overall_damage_state": overall_damage,
-                    "pier_damage_probabilities": pier_damage_probs,
-                    "deck_damage_probabilities": deck_damage_probs
-                }
+                if self.reuse_output:
+                    # 就地覆盖复用的结果对象
+                    th_result = self._th_output
+                    th_result.max_pier_drift = float(max_drift)
+                    th_result.max_deck_displacement = max_deck_disp
+                    th_result.pier_damage_state = pier_damage_state
+                    th_result.deck_damage_state = deck_damage_state
+                    th_result.overall_damage_state = overall_damage
+                    th_result.pier_damage_probabilities = pier_damage_probs
+                    th_result.deck_damage_probabilities = deck_damage_probs
+                    th_result.error = ""
+                else:
+                    th_result = TimeHistoryResult(
+                        max_pier_drift=float(max_drift),
+                        max_deck_displacement=max_deck_disp,
+                        pier_damage_state=pier_damage_state,
+                        deck_damage_state=deck_damage_state,
+                        overall_damage_state=overall_damage,
+                        pier_damage_probabilities=pier_damage_probs,
+                        deck_damage_probabilities=deck_damage_probs
+                    )
+                damage_result["time_history"] = th_result
             except Exception as e:
-                print(f"处理时程分析结果时出错: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.error("处理时程分析结果时出错: %s", e, exc_info=self.verbose)
                 
-                damage_result["time_history"] = {
-                    "max_pier_drift": 0.0,
-                    "max_deck_displacement": [0.0, 0.0, 0.0],
-                    "pier_damage_state": DamageState.NO_DAMAGE,
-                    "deck_damage_state": DamageState.NO_DAMAGE,
-                    "overall_damage_state": DamageState.NO_DAMAGE,
-                    "pier_damage_probabilities": {state.name: 0.0 for state in DamageState},
-                    "deck_damage_probabilities": {state.name: 0.0 for state in DamageState},
-                    "error": str(e)
-                }
+                damage_result["time_history"] = TimeHistoryResult(error=str(e))
         
         return damage_result
     
+    def _scratch_buffer(self, key, shape, dtype):
+        """获取指定用途的临时数组，形状或类型变化时才重新分配"""
+        buf = self._scratch.get(key)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._scratch[key] = buf
+        return buf
+    
     def _evaluate_damage_state(self, component_type, demand):
         """
         评估给定需求下的损伤状态
@@ -158,22 +290,19 @@ class DamageEvaluator:
         返回:
             DamageState 枚举值
         """
-        fragility = self.fragility_params[component_type]
-        
-        # 从高到低检查损伤状态
-        for state in reversed(list(DamageState)):
-            if state == DamageState.NO_DAMAGE:
-                return state
-                
-            if state in fragility:
-                median = fragility[state]["median"]
-                beta = fragility[state]["beta"]
-                
-                # 使用对数正态累积分布函数计算超越概率
-                if demand >= median:
-                    return state
+        return _STATES_LIST[self._evaluate_damage_state_idx(component_type, demand)]
+    
+    def _evaluate_damage_state_idx(self, component_type, demand):
+        """
+        评估给定需求下的损伤状态，返回其整数值（即 DamageState 的值）
         
-        return DamageState.NO_DAMAGE
+        需求为 NaN 时为无损伤；结果不超过定义了中值的最高损伤状态
+        （需求为 inf 时不会落入补位为 inf 的未定义状态）
+        """
+        if demand != demand:
+            return 0
+        idx = int(np.searchsorted(self._sorted_medians[component_type], demand, side='right'))
+        return min(idx, self._max_state_idx[component_type])
     
     def _calculate_damage_probabilities(self, component_type, demand):
         """
@@ -186,49 +315,52 @@ class DamageEvaluator:
         返回:
             包含各损伤状态概率的字典
         """
-        fragility = self.fragility_params[component_type]
-        probabilities = {}
+        _, conditional = self._evaluate(component_type, demand)
+        return dict(zip(_STATE_NAMES, conditional.tolist()))
+    
+    def _evaluate(self, component_type, demand):
+        """
+        一次求出给定需求下的损伤状态和各损伤状态的条件概率
         
-        for state in DamageState:
-            if state == DamageState.NO_DAMAGE:
-                continue
-                
-            if state in fragility:
-                median = fragility[state]["median"]
-                beta = fragility[state]["beta"]
-                
-                # 计算超越概率
-                if demand > 0:
-                    z = np.log(demand / median) / beta
-                    prob = self._standard_normal_cdf(z)
-                else:
-                    prob = 0.0
-                
-                probabilities[state.name] = prob
-        
-        # 计算处于各损伤状态的条件概率
-        conditional_probs = {}
-        prev_prob = 0.0
-        
-        for state in DamageState:
-            if state == DamageState.NO_DAMAGE:
-                conditional_probs[state.name] = 1.0 - probabilities.get(DamageState.SLIGHT.name, 0.0)
-            elif state == DamageState.COMPLETE:
-                conditional_probs[state.name] = probabilities.get(state.name, 0.0)
-            else:
-                current_prob = probabilities.get(state.name, 0.0)
-                next_state = DamageState(state.value + 1)
-                next_prob = probabilities.get(next_state.name, 0.0)
-                conditional_probs[state.name] = current_prob - next_prob
-        
-        return conditional_probs
+        返回:
+            (DamageState 枚举值, 长度为5的条件概率数组，下标为 DamageState 的值)
+        """
+        state_idx, conditional = evaluate_component(
+            demand, self._sorted_medians[component_type],
+            self._medians[component_type], self._betas[component_type])
+        return _STATES_LIST[state_idx], conditional
     
-    def _standard_normal_cdf(self, x):
+    def _calculate_damage_probabilities_batch(self, component_type, demands):
         """
-        标准正态分布累积分布函数
+        批量计算一组需求值下各损伤状态的概率（用于蒙特卡洛易损性分析）
+        
+        参数:
+            component_type: 构件类型
+            demands: 需求值数组，形状 (N,)
+            
+        返回:
+            条件概率矩阵，形状 (N, 5)，列下标为 DamageState 的值
         """
-        return 0.5 * (1 + np.math.erf(x / np.sqrt(2)))
+        demands = np.asarray(demands, dtype=float).reshape(-1, 1)
+        positive = demands[:, 0] > 0
+        medians = self._medians[component_type]
+        
+        # 一次向量化计算全部样本、全部损伤状态的超越概率；
+        # 与 evaluate_component 一致：非正需求和未定义（中值为 inf）的损伤状态超越概率为0，
+        # 需求为 inf 时已定义的损伤状态超越概率为1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            safe = np.where(positive[:, None], demands, 1.0)
+            z = np.log(safe / medians) / self._betas[component_type]
+        exceed = ndtr(z)
+        exceed[~positive] = 0.0
+        exceed[:, np.isinf(medians)] = 0.0
         
+        conditional = np.empty((demands.shape[0], len(_STATES_LIST)))
+        conditional[:, 0] = 1.0 - exceed[:, 0]
+        conditional[:, 1:-1] = exceed[:, :-1] - exceed[:, 1:]
+        conditional[:, -1] = exceed[:, -1]
+        return conditional
+    
     def get_damage_description(self, damage_state):
         """
         获取损伤状态的文字描述
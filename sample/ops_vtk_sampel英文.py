@@ -1,6 +1,7 @@
 import openseespy.opensees as ops
 import vtk
 import numpy as np
+from vtk.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray, ID_TYPE_CODE
 
 # Clear the model
 ops.wipe()
@@ -71,13 +72,25 @@ ops.element('stdBrick', 21, 21, 22, 23, 24, 25, 26, 27, 28, 1)
 # 4. Extract model data for VTK visualization
 # =============================================
 node_tags = ops.getNodeTags()
-node_coords = np.array([ops.nodeCoord(n) for n in node_tags])
+node_coords = np.empty((len(node_tags), 3))
+for i, n in enumerate(node_tags):
+    node_coords[i] = ops.nodeCoord(n)
 
 # Get element connectivity
 beam_conn = [ops.eleNodes(ele) for ele in [1,2,3,4]]  # Beams
 shell_conn = [ops.eleNodes(11)]                       # Shell
 solid_conn = [ops.eleNodes(21)]                       # Solid
 
+def make_cell_array(ids):
+    """Pack an (n_cells, k) point-id table into a vtkCellArray in one call"""
+    n_cells, k = ids.shape
+    flat = np.empty((n_cells, k + 1), dtype=ID_TYPE_CODE)
+    flat[:, 0] = k
+    flat[:, 1:] = ids
+    cells = vtk.vtkCellArray()
+    cells.SetCells(n_cells, numpy_to_vtkIdTypeArray(flat.ravel(), deep=True))
+    return cells
+
 # Create VTK rendering pipeline
 renderer = vtk.vtkRenderer()
 render_window = vtk.vtkRenderWindow()
@@ -87,23 +100,20 @@ render_window.SetSize(800, 600)
 interactor = vtk.vtkRenderWindowInteractor()
 interactor.SetRenderWindow(render_window)
 
-# Create points (all nodes)
+# Create points (all nodes) directly from the coordinate array
 points = vtk.vtkPoints()
-for coord in node_coords:
-    points.InsertNextPoint(coord)
+points.SetData(numpy_to_vtk(node_coords, deep=True))
 
-# Create a mapping from node tag to VTK point ID
-node_id_map = {tag: i for i, tag in enumerate(node_tags)}
+# Dense lookup table from node tag to VTK point ID (node tags are small integers)
+tags_arr = np.asarray(node_tags, dtype=np.int32)
+node_id_map = np.full(tags_arr.max() + 1, -1, dtype=np.int32)
+node_id_map[tags_arr] = np.arange(tags_arr.size, dtype=np.int32)
 
 # =============================================
 # (1) Display beam elements (blue lines)
 # =============================================
-lines = vtk.vtkCellArray()
-for conn in beam_conn:
-    line = vtk.vtkLine()
-    line.GetPointIds().SetId(0, node_id_map[conn[0]])
-    line.GetPointIds().SetId(1, node_id_map[conn[1]])
-    lines.InsertNextCell(line)
+beam_ids = node_id_map[np.asarray(beam_conn)]
+lines = make_cell_array(beam_ids)
 
 line_data = vtk.vtkPolyData()
 line_data.SetPoints(points)
@@ -121,12 +131,8 @@ renderer.AddActor(line_actor)
 # =============================================
 # (2) Display shell element (green surface)
 # =============================================
-quads = vtk.vtkCellArray()
-for conn in shell_conn:
-    quad = vtk.vtkQuad()
-    for i in range(4):
-        quad.GetPointIds().SetId(i, node_id_map[conn[i]])
-    quads.InsertNextCell(quad)
+shell_ids = node_id_map[np.asarray(shell_conn)]
+quads = make_cell_array(shell_ids)
 
 shell_data = vtk.vtkPolyData()
 shell_data.SetPoints(points)
@@ -144,12 +150,8 @@ renderer.AddActor(shell_actor)
 # =============================================
 # (3) Display solid element (yellow volume)
 # =============================================
-hexahedrons = vtk.vtkCellArray()
-for conn in solid_conn:
-    hex = vtk.vtkHexahedron()
-    for i in range(8):
-        hex.GetPointIds().SetId(i, node_id_map[conn[i]])
-    hexahedrons.InsertNextCell(hex)
+solid_ids = node_id_map[np.asarray(solid_conn)]
+hexahedrons = make_cell_array(solid_ids)
 
 solid_data = vtk.vtkUnstructuredGrid()
 solid_data.SetPoints(points)
@@ -167,11 +169,7 @@ renderer.AddActor(solid_actor)
 # =============================================
 # (4) Display nodes (red points)
 # =============================================
-vertices = vtk.vtkCellArray()
-for i in range(len(node_coords)):
-    vertex = vtk.vtkVertex()
-    vertex.GetPointIds().SetId(0, i)
-    vertices.InsertNextCell(vertex)
+vertices = make_cell_array(np.arange(len(node_coords)).reshape(-1, 1))
 
 point_cloud = vtk.vtkPolyData()
 point_cloud.SetPoints(points)
@@ -2,6 +2,7 @@
 import openseespy.opensees as ops  # OpenSees有限元分析库
 import vtk  # 可视化工具包
 import numpy as np  # 数值计算库
+from vtk.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray, ID_TYPE_CODE  # NumPy数组与VTK数组互转
 
 # =============================================
 # 第一部分：模型初始化
@@ -84,13 +85,26 @@ ops.element('stdBrick', 21, 21, 22, 23, 24, 25, 26, 27, 28, 1)
 
 # 获取所有节点标签和坐标
 node_tags = ops.getNodeTags()  # 获取所有节点编号
-node_coords = np.array([ops.nodeCoord(n) for n in node_tags])  # 获取所有节点坐标
+node_coords = np.empty((len(node_tags), 3))  # 预分配节点坐标数组
+for i, n in enumerate(node_tags):
+    node_coords[i] = ops.nodeCoord(n)  # 获取节点坐标
 
 # 获取各类单元连接关系
 beam_conn = [ops.eleNodes(ele) for ele in [1,2,3,4]]  # 梁单元连接关系
 shell_conn = [ops.eleNodes(11)]                       # 壳单元连接关系
 solid_conn = [ops.eleNodes(21)]                       # 实体单元连接关系
 
+def make_cell_array(ids):
+    """将 (单元数, 每单元节点数) 的点ID表一次性打包为vtkCellArray"""
+    n_cells, k = ids.shape
+    # VTK的单元数组格式: [节点数, id0, id1, ..., 节点数, id0, id1, ...]
+    flat = np.empty((n_cells, k + 1), dtype=ID_TYPE_CODE)
+    flat[:, 0] = k
+    flat[:, 1:] = ids
+    cells = vtk.vtkCellArray()
+    cells.SetCells(n_cells, numpy_to_vtkIdTypeArray(flat.ravel(), deep=True))
+    return cells
+
 # =============================================
 # 第六部分：VTK可视化设置
 # =============================================
@@ -105,26 +119,22 @@ render_window.SetSize(800, 600)       # 设置窗口大小
 interactor = vtk.vtkRenderWindowInteractor()
 interactor.SetRenderWindow(render_window)
 
-# 创建点集 (存储所有节点坐标)
+# 创建点集 (存储所有节点坐标)，坐标数组整体写入，无需逐点插入
 points = vtk.vtkPoints()
-for coord in node_coords:
-    points.InsertNextPoint(coord)  # 添加节点坐标
+points.SetData(numpy_to_vtk(node_coords, deep=True))
 
-# 创建节点标签到VTK点ID的映射
-node_id_map = {tag: i for i, tag in enumerate(node_tags)}
+# 创建节点标签到VTK点ID的映射 (节点编号为小整数，使用稠密查找表)
+tags_arr = np.asarray(node_tags, dtype=np.int32)
+node_id_map = np.full(tags_arr.max() + 1, -1, dtype=np.int32)
+node_id_map[tags_arr] = np.arange(tags_arr.size, dtype=np.int32)
 
 # =============================================
 # 6.1 可视化梁单元 (蓝色线)
 # =============================================
 
-# 创建线单元容器
-lines = vtk.vtkCellArray()
-for conn in beam_conn:
-    line = vtk.vtkLine()
-    # 设置线单元的两个端点 (注意使用映射后的ID)
-    line.GetPointIds().SetId(0, node_id_map[conn[0]])
-    line.GetPointIds().SetId(1, node_id_map[conn[1]])
-    lines.InsertNextCell(line)
+# 创建线单元容器 (注意使用映射后的ID)
+beam_ids = node_id_map[np.asarray(beam_conn)]
+lines = make_cell_array(beam_ids)
 
 # 创建线单元数据集
 line_data = vtk.vtkPolyData()
@@ -145,13 +155,9 @@ renderer.AddActor(line_actor)                # 添加到渲染器
 # 6.2 可视化壳单元 (绿色面)
 # =============================================
 
-# 创建四边形单元容器
-quads = vtk.vtkCellArray()
-for conn in shell_conn:
-    quad = vtk.vtkQuad()
-    for i in range(4):  # 四边形有4个节点
-        quad.GetPointIds().SetId(i, node_id_map[conn[i]])
-    quads.InsertNextCell(quad)
+# 创建四边形单元容器 (四边形有4个节点)
+shell_ids = node_id_map[np.asarray(shell_conn)]
+quads = make_cell_array(shell_ids)
 
 # 创建壳单元数据集
 shell_data = vtk.vtkPolyData()
@@ -172,13 +178,9 @@ renderer.AddActor(shell_actor)
 # 6.3 可视化实体单元 (黄色体)
 # =============================================
 
-# 创建六面体单元容器
-hexahedrons = vtk.vtkCellArray()
-for conn in solid_conn:
-    hex = vtk.vtkHexahedron()
-    for i in range(8):  # 六面体有8个节点
-        hex.GetPointIds().SetId(i, node_id_map[conn[i]])
-    hexahedrons.InsertNextCell(hex)
+# 创建六面体单元容器 (六面体有8个节点)
+solid_ids = node_id_map[np.asarray(solid_conn)]
+hexahedrons = make_cell_array(solid_ids)
 
 # 创建实体单元数据集
 solid_data = vtk.vtkUnstructuredGrid()
@@ -199,12 +201,8 @@ renderer.AddActor(solid_actor)
 # 6.4 可视化节点 (红点)
 # =============================================
 
-# 创建顶点容器
-vertices = vtk.vtkCellArray()
-for i in range(len(node_coords)):
-    vertex = vtk.vtkVertex()
-    vertex.GetPointIds().SetId(0, i)  # 每个节点作为一个顶点
-    vertices.InsertNextCell(vertex)
+# 创建顶点容器 (每个节点作为一个顶点)
+vertices = make_cell_array(np.arange(len(node_coords)).reshape(-1, 1))
 
 # 创建点云数据集
 point_cloud = vtk.vtkPolyData()
@@ -1,20 +1,33 @@
+from vtk.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray, ID_TYPE_CODE
+
 # 假设已进行静力/动力分析，提取位移
 disp_scale = 10  # 位移放大系数
-node_disps = np.array([ops.nodeDisp(n) for n in node_tags])
-deformed_coords = node_coords + disp_scale * node_disps[:, :3]
+node_disps = np.empty((len(node_tags), 3))  # 预分配节点位移数组（只取平动分量）
+for i, n in enumerate(node_tags):
+    node_disps[i] = ops.nodeDisp(n)[:3]
+deformed_coords = node_coords + disp_scale * node_disps
+
+# 变形后的节点坐标整体写入点集
+deformed_points = vtk.vtkPoints()
+deformed_points.SetData(numpy_to_vtk(deformed_coords, deep=True))
+
+# 绘制变形后的单元（绿色），所有单元合并为一个数据集
+# 单元数组格式: [2, id0, id1, 2, id0, id1, ...]
+line_ids = np.empty((len(ele_conn), 3), dtype=ID_TYPE_CODE)
+line_ids[:, 0] = 2
+line_ids[:, 1:] = np.asarray([conn[:2] for conn in ele_conn]) - 1
+deformed_lines = vtk.vtkCellArray()
+deformed_lines.SetCells(len(ele_conn), numpy_to_vtkIdTypeArray(line_ids.ravel(), deep=True))
 
-# 绘制变形后的单元（绿色）
-for conn in ele_conn:
-    line = vtk.vtkLineSource()
-    line.SetPoint1(deformed_coords[conn[0]-1])
-    line.SetPoint2(deformed_coords[conn[1]-1])
-    line.Update()
+deformed_data = vtk.vtkPolyData()
+deformed_data.SetPoints(deformed_points)
+deformed_data.SetLines(deformed_lines)
 
-    mapper = vtk.vtkPolyDataMapper()
-    mapper.SetInputConnection(line.GetOutputPort())
+mapper = vtk.vtkPolyDataMapper()
+mapper.SetInputData(deformed_data)
 
-    actor = vtk.vtkActor()
-    actor.SetMapper(mapper)
-    actor.GetProperty().SetColor(0, 1, 0)  # 绿色
-    actor.GetProperty().SetLineWidth(3)
-    renderer.AddActor(actor)
\ No newline at end of file
+actor = vtk.vtkActor()
+actor.SetMapper(mapper)
+actor.GetProperty().SetColor(0, 1, 0)  # 绿色
+actor.GetProperty().SetLineWidth(3)
+renderer.AddActor(actor)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+ops = pytest.importorskip("openseespy.opensees")
+
+from model.analysis_runner import AnalysisRunner
+
+
+def _build_frame():
+    """建立与 BridgeModel 节点、单元编号一致的二维门式框架（带集中质量）"""
+    ops.wipe()
+    ops.model('basic', '-ndm', 2, '-ndf', 3)
+    ops.node(1, 0.0, 0.0)
+    ops.node(2, 20.0, 0.0)
+    ops.node(3, 0.0, 10.0)
+    ops.node(4, 20.0, 10.0)
+    ops.node(5, 10.0, 11.0)
+    ops.fix(1, 1, 1, 1)
+    ops.fix(2, 1, 1, 1)
+    for node in (3, 4, 5):
+        ops.mass(node, 10.0, 10.0, 0.0)
+    ops.geomTransf('Linear', 1)
+    ops.element('elasticBeamColumn', 1, 1, 3, 1.44, 3000.0, 0.1728, 1)
+    ops.element('elasticBeamColumn', 2, 2, 4, 1.44, 3000.0, 0.1728, 1)
+    ops.element('elasticBeamColumn', 3, 3, 5, 3.0, 3000.0, 1.0, 1)
+    ops.element('elasticBeamColumn', 4, 5, 4, 3.0, 3000.0, 1.0, 1)
+
+
+def _write_record(path, scale):
+    acc = scale * np.sin(np.linspace(0.0, 6.0, 60))
+    np.savetxt(path, acc)
+    return str(path)
+
+
+def _run(runner, record):
+    _build_frame()
+    return runner.run_time_history_analysis(record, 0.02, analysis_dt=0.01, total_time=0.5)
+
+
+def test_two_time_history_results_held_at_once(tmp_path):
+    """默认情况下第二次时程分析不会覆盖调用方仍持有的第一次结果"""
+    runner = AnalysisRunner()
+    first = _run(runner, _write_record(tmp_path / "eq1.txt", 1.0))
+    first_disp = first["displacements"].copy()
+    first_force = first["element_forces"].copy()
+
+    second = _run(runner, _write_record(tmp_path / "eq2.txt", 2.0))
+
+    assert first["displacements"].shape == second["displacements"].shape
+    assert not np.shares_memory(first["displacements"], second["displacements"])
+    np.testing.assert_array_equal(first["displacements"], first_disp)
+    np.testing.assert_array_equal(first["element_forces"], first_force)
+    assert not np.array_equal(first["displacements"], second["displacements"])
+
+
+def test_reuse_buffers_opt_in(tmp_path):
+    """开启 reuse_buffers 后步数相同的分析复用同一组数组"""
+    runner = AnalysisRunner(reuse_buffers=True)
+    first = _run(runner, _write_record(tmp_path / "eq1.txt", 1.0))
+    second = _run(runner, _write_record(tmp_path / "eq2.txt", 2.0))
+
+    assert np.shares_memory(first["displacements"], second["displacements"])
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from model.damage_evaluator import DamageEvaluator, DamageState
+
+
+def _partial_fragility():
+    """只定义部分损伤状态的易损性参数"""
+    return {
+        "pier_drift": {
+            DamageState.SLIGHT: {"median": 0.004, "beta": 0.5},
+            DamageState.EXTENSIVE: {"median": 0.025, "beta": 0.5}
+        },
+        "deck_disp": {
+            DamageState.MODERATE: {"median": 0.05, "beta": 0.6}
+        }
+    }
+
+
+@pytest.mark.parametrize("component_type", ["pier_drift", "deck_disp"])
+def test_batch_matches_scalar_with_missing_states(component_type):
+    """缺少部分损伤状态时，批量计算与逐个计算的结果一致，需求为 inf 时也不产生 NaN"""
+    evaluator = DamageEvaluator(_partial_fragility())
+    demands = np.array([-1.0, 0.0, 1e-4, 0.004, 0.03, 1.0, np.inf, -np.inf])
+
+    batch = evaluator._calculate_damage_probabilities_batch(component_type, demands)
+
+    assert not np.isnan(batch).any()
+    np.testing.assert_allclose(batch.sum(axis=1), 1.0)
+    for demand, row in zip(demands, batch):
+        _, conditional = evaluator._evaluate(component_type, demand)
+        np.testing.assert_allclose(row, conditional, atol=1e-12)
+
+
+@pytest.mark.parametrize("fragility, expected_inf", [
+    (None, {"pier_drift": DamageState.COMPLETE, "deck_disp": DamageState.COMPLETE}),
+    (_partial_fragility(), {"pier_drift": DamageState.EXTENSIVE, "deck_disp": DamageState.MODERATE}),
+])
+def test_nan_and_inf_demand_match_baseline(fragility, expected_inf):
+    """NaN 需求为无损伤；inf 需求为定义了中值的最高损伤状态，标量、批量与时程三条路径一致"""
+    evaluator = DamageEvaluator(fragility)
+    no_damage = np.array([1.0, 0.0, 0.0, 0.0, 0.0])
+    
+    for component_type, state in expected_inf.items():
+        # 标量路径：searchsorted 查找与JIT核函数
+        assert evaluator._evaluate_damage_state(component_type, np.nan) is DamageState.NO_DAMAGE
+        assert evaluator._evaluate_damage_state(component_type, np.inf) is state
+        nan_state, nan_probs = evaluator._evaluate(component_type, np.nan)
+        assert nan_state is DamageState.NO_DAMAGE
+        np.testing.assert_array_equal(nan_probs, no_damage)
+        assert evaluator._evaluate(component_type, np.inf)[0] is state
+        
+        # 批量路径
+        batch = evaluator._calculate_damage_probabilities_batch(component_type, [np.nan, np.inf])
+        np.testing.assert_array_equal(batch[0], no_damage)
+        np.testing.assert_allclose(batch[1], evaluator._evaluate(component_type, np.inf)[1])
+    
+    # 时程路径：墩顶x向位移（第4列）和桥面中点y向位移（第14列）
+    for demand, pier_state, deck_state in [(np.nan, DamageState.NO_DAMAGE, DamageState.NO_DAMAGE),
+                                           (np.inf, expected_inf["pier_drift"], expected_inf["deck_disp"])]:
+        disp = np.zeros((3, 16))
+        disp[:, 4] = demand
+        disp[:, 14] = demand
+        th = evaluator.evaluate_damage_from_results({"time_history": {"displacements": disp}}, 1.0)["time_history"]
+        assert not th.error
+        assert th.pier_damage_state is pier_state
+        assert th.deck_damage_state is deck_state
@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from controller import bridge_evaluator
+from controller.bridge_evaluator import BridgeEvaluator
+from model.analysis_runner import AnalysisRunner
+
+orjson = pytest.importorskip("orjson")
+
+SAMPLE_INPUT = Path(__file__).resolve().parent.parent / "data" / "sample_input.json"
+
+
+def _make_evaluator():
+    """构造一个不运行分析的评估器（模型在第一次分析时才构建）"""
+    with open(SAMPLE_INPUT) as f:
+        config = json.load(f)
+    return BridgeEvaluator(config_dict=config)
+
+
+def test_th_buffers_are_c_contiguous():
+    """时程缓冲区及截取已完成步后的数组均为C连续"""
+    disp, force = AnalysisRunner()._get_th_buffers(10)
+    assert disp.flags.c_contiguous and force.flags.c_contiguous
+    assert disp[:4].flags.c_contiguous and force[:4].flags.c_contiguous
+
+
+def test_th_arrays_reach_orjson_natively(tmp_path, monkeypatch):
+    """保存结果时时程数组由 orjson 直接序列化，不经过 _json_default 的 tolist() 回退"""
+    runner = AnalysisRunner()
+    disp, force = runner._get_th_buffers(50)
+    disp[:] = np.arange(disp.size, dtype=float).reshape(disp.shape)
+    force[:] = 1.0
+    disp = disp[:20]
+    force = force[:20]
+
+    fallback_types = []
+    original_default = bridge_evaluator._json_default
+
+    def spy_default(obj):
+        fallback_types.append(type(obj))
+        return original_default(obj)
+
+    monkeypatch.setattr(bridge_evaluator, "_json_default", spy_default)
+
+    evaluator = _make_evaluator()
+    evaluator.results = {
+        "analysis": {
+            "time_history": {
+                "displacements": disp,
+                "element_forces": force,
+                "time_points": np.ascontiguousarray(disp[:, 0])
+            }
+        }
+    }
+    result_file = tmp_path / "results.json"
+    evaluator._save_results(str(result_file))
+
+    assert np.ndarray not in fallback_types
+    saved = orjson.loads(result_file.read_bytes())["analysis"]["time_history"]
+    np.testing.assert_array_equal(saved["displacements"], disp)
+    np.testing.assert_array_equal(saved["element_forces"], force)
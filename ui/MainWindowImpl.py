@@ -3,18 +3,53 @@ import sys
 import numpy as np
 import os
 import json
-from PySide6.QtWidgets import QFileDialog, QMessageBox, QVBoxLayout
-from PySide6.QtCore import Qt, QSize, QTimer
-from PySide6.QtGui import QVector3D
+from PySide6.QtWidgets import QFileDialog, QMessageBox, QVBoxLayout, QPushButton
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QVector3D, QTextCursor
 
 from ui.bridge_visualizer import BridgeVisualizerWidget
 from model.bridge import BridgeModel
+import pyqtgraph as pg
 import pyqtgraph.opengl as gl
 
+# 坐标系小部件常驻显示，关闭抗锯齿以降低每次重绘的开销
+pg.setConfigOptions(antialias=False, enableExperimental=True)
+
+# 坐标轴箭头：沿 +X 方向、尖端位于原点的四棱锥，所有轴共用
+_CONE_VERTS = np.array([
+    [0, 0, 0],      # 箭头尖端
+    [-1, 0.5, 0],   # 左后
+    [-1, -0.5, 0],  # 右后
+    [-1, 0, 0.5],   # 上后
+    [-1, 0, -0.5]   # 下后
+]) * 0.5
+
+# 四个侧面按底面顶点环绕顺序排列，底面由两个三角形封闭
+_CONE_FACES = np.array([
+    [0, 1, 3],
+    [0, 3, 2],
+    [0, 2, 4],
+    [0, 4, 1],
+    [1, 3, 2],
+    [2, 4, 1]
+])
+
+# 将 +X 方向旋转到各坐标轴方向的旋转矩阵
+_AXIS_ROTATIONS = {
+    'x': np.eye(3),
+    'y': np.array([[0, -1, 0], [1, 0, 0], [0, 0, 1]]),
+    'z': np.array([[0, 0, -1], [0, 1, 0], [1, 0, 0]])
+}
+
 class CoordinateSystemWidget(gl.GLViewWidget):
     """专门用于显示坐标系的小部件"""
     def __init__(self, parent=None):
         super().__init__(parent)
+        # 关闭多重采样
+        fmt = self.format()
+        fmt.setSamples(0)
+        self.setFormat(fmt)
+        
         # 设置黑色背景
         self.setBackgroundColor('k')  # 'k'表示黑色
         
@@ -49,51 +84,11 @@ class CoordinateSystemWidget(gl.GLViewWidget):
         )
         self.addItem(axis_line)
         
-        # 计算箭头顶点
-        x, y, z = end
-        arrow_size = 0.5  # 缩小箭头大小
-        
-        # 根据轴方向创建箭头
-        if axis_name == 'x':
-            # 创建简单的箭头 - 使用两个三角形形成锥体
-            arrow_verts = np.array([
-                [x, y, z],                      # 箭头尖端
-                [x - arrow_size, y + arrow_size/2, z],  # 左后
-                [x - arrow_size, y - arrow_size/2, z],  # 右后
-                [x - arrow_size, y, z + arrow_size/2],  # 上后
-                [x - arrow_size, y, z - arrow_size/2]   # 下后
-            ])
-            
-        elif axis_name == 'y':
-            arrow_verts = np.array([
-                [x, y, z],                      # 箭头尖端
-                [x + arrow_size/2, y - arrow_size, z],  # 右后
-                [x - arrow_size/2, y - arrow_size, z],  # 左后
-                [x, y - arrow_size, z + arrow_size/2],  # 上后
-                [x, y - arrow_size, z - arrow_size/2]   # 下后
-            ])
-            
-        else:  # z轴
-            arrow_verts = np.array([
-                [x, y, z],                      # 箭头尖端
-                [x + arrow_size/2, y, z - arrow_size],  # 右后
-                [x - arrow_size/2, y, z - arrow_size],  # 左后
-                [x, y + arrow_size/2, z - arrow_size],  # 前后
-                [x, y - arrow_size/2, z - arrow_size]   # 后后
-            ])
-        
-        # 创建面 - 使用三角形
-        arrow_faces = np.array([
-            [0, 1, 2],  # 底部
-            [0, 1, 3],  # 侧面
-            [0, 2, 3],  # 侧面
-            [0, 2, 4],  # 侧面
-            [0, 3, 4],  # 侧面
-            [0, 1, 4]   # 侧面
-        ])
+        # 将共享的锥体网格旋转到轴方向后平移到轴端点
+        arrow_verts = _CONE_VERTS @ _AXIS_ROTATIONS[axis_name].T + np.asarray(end)
         
         # 创建网格数据
-        md = gl.MeshData(vertexes=arrow_verts, faces=arrow_faces)
+        md = gl.MeshData(vertexes=arrow_verts, faces=_CONE_FACES)
         arrow_head = gl.GLMeshItem(
             meshdata=md,
             color=color,
@@ -111,13 +106,68 @@ class CoordinateSystemWidget(gl.GLViewWidget):
         self.addItem(label)
         
         # 尝试添加文本标签 (使用大点作为标记)
-        if axis_name == 'x':
-            self.addItem(gl.GLTextItem(pos=(end[0] * 1.2, end[1] * 1.2, end[2] * 1.2), text='X', color=color))
-        elif axis_name == 'y':
-            self.addItem(gl.GLTextItem(pos=(end[0] * 1.2, end[1] * 1.2, end[2] * 1.2), text='Y', color=color))
-        elif axis_name == 'z':
-            self.addItem(gl.GLTextItem(pos=(end[0] * 1.2, end[1] * 1.2, end[2] * 1.2), text='Z', color=color))
+        self.addItem(gl.GLTextItem(pos=(end[0] * 1.2, end[1] * 1.2, end[2] * 1.2), text=axis_name.upper(), color=color))
     
+# 信息框的 HTML 只在初始化时解析一次，数值位置先用占位符标记，之后只替换这些文本片段
+def _info_placeholder(key):
+    return f'__{key.upper()}__'
+
+_INFO_STYLE = """
+        <head>
+            <style>
+                body {{ font-family: Arial; font-size: 12pt; }}
+                h3 {{ color: #336699; }}
+                table {{ border-collapse: collapse; width: 100%; }}
+                th, td {{ padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }}
+            </style>
+        </head>"""
+
+_BASIC_INFO_HTML = ("""
+        <!DOCTYPE HTML>
+        <html>""" + _INFO_STYLE + """
+        <body>
+            <h3>桥梁基本信息</h3>
+            <table>
+                <tr><td>桥梁类型</td><td>斜拉桥</td></tr>
+                <tr><td>主跨</td><td>{span_length} m</td></tr>
+                <tr><td>塔高</td><td>{tower_height} m</td></tr>
+                <tr><td>设计标准</td><td>公路-I级</td></tr>
+            </table>
+            <h3>材料参数</h3>
+            <table>
+                <tr><td>混凝土强度</td><td>{fc} MPa</td></tr>
+                <tr><td>弹性模量</td><td>{e_modulus} MPa</td></tr>
+            </table>
+        </body>
+        </html>
+        """)
+
+_BASIC_INFO_FIELDS = ('span_length', 'tower_height', 'fc', 'e_modulus')
+
+_STRUCTURE_INFO_HTML = ("""
+        <!DOCTYPE HTML>
+        <html>""" + _INFO_STYLE + """
+        <body>
+            <h3>结构特性</h3>
+            <table>
+                <tr><td>重量</td><td>{weight} kN</td></tr>
+                <tr><td>桥面宽度</td><td>{deck_width} m</td></tr>
+                <tr><td>抗震设防</td><td>8度</td></tr>
+                <tr><td>塔柱截面</td><td>{pier_section} m</td></tr>
+                <tr><td>拉索数量</td><td>48 根</td></tr>
+            </table>
+        </body>
+        </html>
+        """)
+
+_STRUCTURE_INFO_FIELDS = ('weight', 'deck_width', 'pier_section')
+
+_BASIC_INFO_HTML = _BASIC_INFO_HTML.format(**{key: _info_placeholder(key) for key in _BASIC_INFO_FIELDS})
+_STRUCTURE_INFO_HTML = _STRUCTURE_INFO_HTML.format(**{key: _info_placeholder(key) for key in _STRUCTURE_INFO_FIELDS})
+
+# 坐标系视角同步的最小角度变化（度）
+_VIEW_SYNC_THRESHOLD = 0.5
+
 class MainWindowImpl(pretreatment.Ui_MainWindow):
     def __init__(self, window):
         super().__init__()
@@ -149,31 +199,33 @@ class MainWindowImpl(pretreatment.Ui_MainWindow):
             }
         }
         
-        # 设置定时器以更新坐标系视图
+        # 主视图旋转时同步坐标系视图
         self.setup_rotation_sync()
         
     def setup_rotation_sync(self):
-        self.sync_timer = QTimer()
-        self.sync_timer.timeout.connect(self.sync_coordinate_system)
-        self.sync_timer.start(100)  # 每100毫秒更新一次
+        """连接主视图的视角变化信号，仅在相机实际旋转时更新坐标系"""
+        self.bridge_visualizer.viewChanged.connect(self.sync_coordinate_system)
+        # 同步一次初始视角
+        self.bridge_visualizer.emit_view_changed()
         
-    def sync_coordinate_system(self):
-        if hasattr(self, 'bridge_visualizer') and hasattr(self, 'coord_system') and hasattr(self.bridge_visualizer, 'gl_view'):
-            main_view = self.bridge_visualizer.gl_view
-
-            if main_view.opts['azimuth'] != getattr(self, '_last_azimuth', None) or \
-               main_view.opts['elevation'] != getattr(self, '_last_elevation', None):
-                
-                # 记录新的视角
-                self._last_azimuth = main_view.opts['azimuth']
-                self._last_elevation = main_view.opts['elevation']
-                
-                # 设置坐标系视角
-                self.coord_system.setCameraPosition(
-                    distance=8,
-                    elevation=main_view.opts['elevation'],
-                    azimuth=main_view.opts['azimuth']
-                )
+    def sync_coordinate_system(self, azimuth, elevation):
+        last_azimuth = getattr(self, '_last_azimuth', None)
+        last_elevation = getattr(self, '_last_elevation', None)
+        # 视角变化小于阈值时不重绘坐标系；方位角差按 ±180° 取最短角距离
+        if last_azimuth is None or \
+           abs((azimuth - last_azimuth + 180) % 360 - 180) >= _VIEW_SYNC_THRESHOLD or \
+           abs(elevation - last_elevation) >= _VIEW_SYNC_THRESHOLD:
+            
+            # 记录新的视角
+            self._last_azimuth = azimuth
+            self._last_elevation = elevation
+            
+            # 设置坐标系视角
+            self.coord_system.setCameraPosition(
+                distance=8,
+                elevation=elevation,
+                azimuth=azimuth
+            )
     
     def replace_opengl_widget(self):
         """替换默认的OpenGL控件为自定义的桥梁可视化控件和坐标系控件"""
@@ -193,6 +245,9 @@ class MainWindowImpl(pretreatment.Ui_MainWindow):
         # 设置坐标系小部件
         self.setup_coordinate_system()
         
+        # 设置俯视/透视切换按钮
+        self.setup_view_toggle()
+        
     def setup_coordinate_system(self):
         """设置坐标系小部件"""
         coords_geometry = self.openGLWidget_2.geometry()
@@ -212,60 +267,44 @@ class MainWindowImpl(pretreatment.Ui_MainWindow):
 
         print(f"坐标系窗口位置: {coords_geometry.x()}, {coords_geometry.y()}, 大小: {coords_geometry.width()}x{coords_geometry.height()}")
         
+    def setup_view_toggle(self):
+        """在主视图右上角放置俯视图与透视图的切换按钮"""
+        view_geometry = self.bridge_visualizer.geometry()
+        
+        self.view_toggle = QPushButton("俯视图", self.centralwidget)
+        self.view_toggle.setCheckable(True)
+        self.view_toggle.adjustSize()
+        self.view_toggle.move(view_geometry.right() - self.view_toggle.width() - 10, view_geometry.top() + 10)
+        self.view_toggle.toggled.connect(self.toggle_plan_view)
+        
+        self.view_toggle.show()
+        self.view_toggle.raise_()
+        
+    def toggle_plan_view(self, checked):
+        """在正交投影的俯视图与透视斜视图之间切换"""
+        if checked:
+            self.bridge_visualizer.set_top_down_view()
+            self.view_toggle.setText("透视图")
+        else:
+            self.bridge_visualizer.set_perspective_view()
+            self.view_toggle.setText("俯视图")
+        
     def init_bridge_info(self):
         """初始化桥梁信息"""
-        # 这里可以设置默认信息到textBrowser中
-        self.textBrowser.setHtml("""
-        <!DOCTYPE HTML>
-        <html>
-        <head>
-            <style>
-                body { font-family: Arial; font-size: 12pt; }
-                h3 { color: #336699; }
-                table { border-collapse: collapse; width: 100%; }
-                th, td { padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }
-            </style>
-        </head>
-        <body>
-            <h3>桥梁基本信息</h3>
-            <table>
-                <tr><td>桥梁类型</td><td>斜拉桥</td></tr>
-                <tr><td>主跨</td><td>40.0 m</td></tr>
-                <tr><td>塔高</td><td>30.0 m</td></tr>
-                <tr><td>设计标准</td><td>公路-I级</td></tr>
-            </table>
-            <h3>材料参数</h3>
-            <table>
-                <tr><td>混凝土强度</td><td>30.0 MPa</td></tr>
-                <tr><td>弹性模量</td><td>3000.0 MPa</td></tr>
-            </table>
-        </body>
-        </html>
-        """)
+        # 解析一次 HTML，记录每个数值占位符的文本光标，之后只替换对应片段
+        self._info_cursors = {}
+        for browser, html, fields in ((self.textBrowser, _BASIC_INFO_HTML, _BASIC_INFO_FIELDS),
+                                      (self.textBrowser_2, _STRUCTURE_INFO_HTML, _STRUCTURE_INFO_FIELDS)):
+            browser.setHtml(html)
+            document = browser.document()
+            for key in fields:
+                self._info_cursors[key] = document.find(_info_placeholder(key))
         
-        self.textBrowser_2.setHtml("""
-        <!DOCTYPE HTML>
-        <html>
-        <head>
-            <style>
-                body { font-family: Arial; font-size: 12pt; }
-                h3 { color: #336699; }
-                table { border-collapse: collapse; width: 100%; }
-                th, td { padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }
-            </style>
-        </head>
-        <body>
-            <h3>结构特性</h3>
-            <table>
-                <tr><td>重量</td><td>2500 kN</td></tr>
-                <tr><td>桥面宽度</td><td>12.0 m</td></tr>
-                <tr><td>抗震设防</td><td>8度</td></tr>
-                <tr><td>塔柱截面</td><td>2.4×2.4 m</td></tr>
-                <tr><td>拉索数量</td><td>48 根</td></tr>
-            </table>
-        </body>
-        </html>
-        """)
+        # 这里可以设置默认信息到textBrowser中
+        self._set_bridge_info(
+            span_length=40.0, tower_height=30.0, fc=30.0, e_modulus=3000.0,
+            weight=2500, deck_width=12.0, pier_section="2.4×2.4"
+        )
         
     def update_bridge_info(self, params):
         span_length = params.get("span_length", 40.0)
@@ -276,63 +315,29 @@ class MainWindowImpl(pretreatment.Ui_MainWindow):
         e_modulus = material_props.get("E", 3000.0)
         fc = material_props.get("fc", 30.0)
         
-        # 更新第一个文本框
-        self.textBrowser.setHtml(f"""
-        <!DOCTYPE HTML>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial; font-size: 12pt; }}
-                h3 {{ color: #336699; }}
-                table {{ border-collapse: collapse; width: 100%; }}
-                th, td {{ padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }}
-            </style>
-        </head>
-        <body>
-            <h3>桥梁基本信息</h3>
-            <table>
-                <tr><td>桥梁类型</td><td>斜拉桥</td></tr>
-                <tr><td>主跨</td><td>{span_length} m</td></tr>
-                <tr><td>塔高</td><td>{tower_height} m</td></tr>
-                <tr><td>设计标准</td><td>公路-I级</td></tr>
-            </table>
-            <h3>材料参数</h3>
-            <table>
-                <tr><td>混凝土强度</td><td>{fc} MPa</td></tr>
-                <tr><td>弹性模量</td><td>{e_modulus} MPa</td></tr>
-            </table>
-        </body>
-        </html>
-        """)
-        
-        # 更新第二个文本框
         # 假设桥面宽度和重量根据参数计算
         deck_width = 12.0  # 假设值
         weight = span_length * 60  # 假设值，可以根据参数计算
         
-        self.textBrowser_2.setHtml(f"""
-        <!DOCTYPE HTML>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial; font-size: 12pt; }}
-                h3 {{ color: #336699; }}
-                table {{ border-collapse: collapse; width: 100%; }}
-                th, td {{ padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }}
-            </style>
-        </head>
-        <body>
-            <h3>结构特性</h3>
-            <table>
-                <tr><td>重量</td><td>{weight} kN</td></tr>
-                <tr><td>桥面宽度</td><td>{deck_width} m</td></tr>
-                <tr><td>抗震设防</td><td>8度</td></tr>
-                <tr><td>塔柱截面</td><td>{pier_width}×{pier_width} m</td></tr>
-                <tr><td>拉索数量</td><td>48 根</td></tr>
-            </table>
-        </body>
-        </html>
-        """)
+        self._set_bridge_info(
+            span_length=span_length, tower_height=tower_height, fc=fc, e_modulus=e_modulus,
+            weight=weight, deck_width=deck_width, pier_section=f"{pier_width}×{pier_width}"
+        )
+    
+    def _set_bridge_info(self, **values):
+        """只替换发生变化的数值文本，不重新解析整个文档"""
+        for key, value in values.items():
+            cursor = self._info_cursors[key]
+            text = str(value)
+            if cursor.selectedText() == text:
+                continue
+            start = cursor.selectionStart()
+            cursor.beginEditBlock()
+            cursor.insertText(text)
+            cursor.endEditBlock()
+            # 重新选中新文本，供下一次替换
+            cursor.setPosition(start)
+            cursor.setPosition(start + len(text), QTextCursor.MoveMode.KeepAnchor)
     
     def load_model(self):
         """加载桥梁模型"""
@@ -1,12 +1,52 @@
+import math
 import numpy as np
 from PySide6.QtWidgets import QWidget, QVBoxLayout
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal, QTimer
 import vtk
+from vtk.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray, vtk_to_numpy, ID_TYPE_CODE
 from vtkmodules.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
 from model.bridge import BridgeModel
 
+def _to_rgba255(color):
+    """将 0~1 浮点颜色转换为 0~255 整数 RGBA 颜色（不透明）"""
+    return tuple(int(round(c * 255)) for c in color[:3]) + (255,)
+
+CABLE_COLOR = (0.9, 0.9, 0.9)  # 拉索默认颜色
+CABLE_COLOR_RGBA = _to_rgba255(CABLE_COLOR)
+
+# 损伤状态颜色，下标即 DamageState 的值；最后一项为未着色构件的默认灰色
+DAMAGE_COLORS = [
+    (0, 1, 0),      # 绿色 - 无损伤
+    (1, 1, 0),      # 黄色 - 轻微损伤
+    (1, 0.5, 0),    # 橙色 - 中等损伤
+    (1, 0, 0),      # 红色 - 严重损伤
+    (0.5, 0, 0),    # 深红色 - 完全损伤
+    (0.5, 0.5, 0.5) # 灰色 - 默认
+]
+NEUTRAL_DAMAGE_INDEX = len(DAMAGE_COLORS) - 1
+
+# 以原点为中心的单位立方体，桥面板通过变换矩阵缩放平移得到，所有更新共用
+_UNIT_CUBE = vtk.vtkCubeSource()
+_UNIT_CUBE.SetXLength(1)
+_UNIT_CUBE.SetYLength(1)
+_UNIT_CUBE.SetZLength(1)
+_UNIT_CUBE.Update()
+
+# 桥塔六个四边形面的连接关系，按 vtkCellArray 的 [点数, 编号...] 格式排列
+_TOWER_CELLS = np.array([
+    4, 0, 1, 2, 3,  # 底面
+    4, 4, 5, 6, 7,  # 顶面
+    4, 0, 1, 5, 4,  # 前面
+    4, 1, 2, 6, 5,  # 右面
+    4, 2, 3, 7, 6,  # 后面
+    4, 3, 0, 4, 7   # 左面
+], dtype=ID_TYPE_CODE)
+
 class BridgeVisualizerWidget(QWidget):
     """使用VTK实现的桥梁可视化控件"""
+    # 视角变化信号 (方位角, 仰角)，单位为度，与 pyqtgraph 的相机参数约定一致
+    viewChanged = Signal(float, float)
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         
@@ -24,8 +64,43 @@ class BridgeVisualizerWidget(QWidget):
         self.vtk_widget.GetRenderWindow().AddRenderer(self.renderer)
         self.interactor = self.vtk_widget.GetRenderWindow().GetInteractor()
         
+        # 只在相机被交互旋转时通知外部，取代定时轮询
+        style = vtk.vtkInteractorStyleTrackballCamera()
+        self.interactor.SetInteractorStyle(style)
+        style.AddObserver('InteractionEvent', self._on_view_changed)
+        
         # 桥梁组件的引用
         self.bridge_components = {}
+        # 拉索名称到合并数据集中单元编号的映射
+        self.cable_cells = {}
+        self.cable_colors = None
+        self.cable_points = None
+        # 以浅拷贝方式交给 VTK 的 numpy 缓冲区；VTK 数组直接引用这些内存，
+        # 因此它们必须与对应的 vtkDataArray 存活同样长的时间
+        self._cable_verts_buf = None
+        self._cable_offsets_buf = None
+        self._cable_conn_buf = None
+        self._cable_colors_buf = None
+        self._marker_verts_buf = None
+        self._marker_colors_buf = None
+        # 可就地更新的数据源，以及上一次建模的参数 (跨度, 墩高, 塔柱宽度)
+        # 标记点名称到合并点集中点编号的映射
+        self.marker_ids = {}
+        self.marker_points = None
+        self.marker_colors = None
+        self._marker_defaults = None
+        self._deck_transform = vtk.vtkTransform()
+        self._last_params = None
+        # 损伤颜色查找表只创建一次，桥塔通过单元标量索引取色
+        self._damage_lut = vtk.vtkLookupTable()
+        self._damage_lut.SetNumberOfTableValues(len(DAMAGE_COLORS))
+        self._damage_lut.SetTableRange(0, NEUTRAL_DAMAGE_INDEX)
+        for idx, color in enumerate(DAMAGE_COLORS):
+            self._damage_lut.SetTableValue(idx, *color, 1.0)
+        self._damage_lut.Build()
+        
+        # 是否已有待执行的渲染，同一轮事件循环内的多次请求只渲染一次
+        self._render_scheduled = False
         
         # 默认桥梁参数
         self.default_params = {
@@ -40,7 +115,8 @@ class BridgeVisualizerWidget(QWidget):
             }
         }
         
-        # 初始化可视化
+        # 初始化可视化；建模和首次渲染推迟到控件第一次显示时
+        self._initialized = False
         self.initialize()
         
     def initialize(self):
@@ -50,27 +126,88 @@ class BridgeVisualizerWidget(QWidget):
         self.renderer.GetActiveCamera().SetFocalPoint(0, 0, 0)
         self.renderer.GetActiveCamera().SetViewUp(0, 0, 1)
         
-        # 创建斜拉桥模型
-        self.create_cable_stayed_bridge(
-            self.default_params["span_length"],
-            self.default_params["pier_height"],
-            self.default_params["material_props"]
-        )
+        # 视锥裁剪：跳过视野外的演员，屏幕覆盖极小的演员也不绘制
+        cullers = self.renderer.GetCullers()
+        cullers.InitTraversal()
+        culler = cullers.GetNextItem()
+        while culler is not None and not isinstance(culler, vtk.vtkFrustumCoverageCuller):
+            culler = cullers.GetNextItem()
+        if culler is None:
+            culler = vtk.vtkFrustumCoverageCuller()
+            self.renderer.AddCuller(culler)
+        culler.SetMinimumCoverage(0.0001)
+    
+    def _ensure_initialized(self):
+        """首次显示时创建模型、启动交互器并渲染"""
+        if self._initialized:
+            return
+        self._initialized = True
+        
+        # 创建斜拉桥模型（显示前已通过 update_model 建模时保留该模型）
+        if self._last_params is None:
+            self.create_cable_stayed_bridge(
+                self.default_params["span_length"],
+                self.default_params["pier_height"],
+                self.default_params["material_props"]
+            )
         
         # 启动交互器
         self.interactor.Initialize()
         self.vtk_widget.GetRenderWindow().Render()
     
+    def showEvent(self, event):
+        """控件第一次显示时才完成初始化"""
+        super().showEvent(event)
+        self._ensure_initialized()
+    
+    def set_top_down_view(self):
+        """切换为正交投影的俯视（平面）视图"""
+        camera = self.renderer.GetActiveCamera()
+        camera.SetParallelProjection(True)
+        camera.SetFocalPoint(0, 0, 0)
+        camera.SetPosition(0, 0, 1000)
+        camera.SetViewUp(0, 1, 0)
+        self.renderer.ResetCamera()
+        self.emit_view_changed()
+        self._schedule_render()
+    
+    def set_perspective_view(self):
+        """恢复默认的透视投影斜视图"""
+        camera = self.renderer.GetActiveCamera()
+        camera.SetParallelProjection(False)
+        camera.SetFocalPoint(0, 0, 0)
+        camera.SetPosition(80, 80, 80)
+        camera.SetViewUp(0, 0, 1)
+        self.renderer.ResetCamera()
+        self.emit_view_changed()
+        self._schedule_render()
+    
+    def _on_view_changed(self, obj=None, event=None):
+        """相机交互事件的回调"""
+        self.emit_view_changed()
+    
+    def emit_view_changed(self):
+        """根据相机位置与焦点计算方位角和仰角，并发出 viewChanged 信号"""
+        camera = self.renderer.GetActiveCamera()
+        dx, dy, dz = np.subtract(camera.GetPosition(), camera.GetFocalPoint())
+        azimuth = math.degrees(math.atan2(dy, dx))
+        elevation = math.degrees(math.atan2(dz, math.hypot(dx, dy)))
+        self.viewChanged.emit(azimuth, elevation)
+    
     def create_bridge_model(self, span_length, pier_height, material_props):
         """创建斜拉桥模型 - 保留此方法以兼容现有代码"""
         self.create_cable_stayed_bridge(span_length, pier_height, material_props)
 
     def create_cable_stayed_bridge(self, span_length, pier_height, material_props):
-        """创建斜拉桥模型"""
-        # 移除现有组件
-        for component in self.bridge_components.values():
-            self.renderer.RemoveActor(component)
-        self.bridge_components = {}
+        """
+        创建斜拉桥模型
+        
+        模型已创建且拓扑不变时只就地更新几何参数，不重新创建演员
+        """
+        pier_width = material_props.get('pier_width', 1.2)
+        params = (span_length, pier_height, pier_width)
+        if params == self._last_params:
+            return
         
         # 基本参数
         tower_height = pier_height * 2  # 桥塔高度
@@ -79,204 +216,238 @@ class BridgeVisualizerWidget(QWidget):
         
         # 桥塔位置
         tower_spacing = span_length * 0.6  # 桥塔间距
+        left_tower_pos = -tower_spacing/2
+        right_tower_pos = tower_spacing/2
         
-        # 创建桥面板
-        deck_length = span_length * 1.2  # 桥面长度稍大于主跨
-        deck = self._create_deck(-deck_length/2, -deck_width/2, 0, deck_length, deck_width, deck_thickness)
-        self.renderer.AddActor(deck)
-        self.bridge_components['deck'] = deck
+        # 桥面长度稍大于主跨
+        deck_length = span_length * 1.2
         
         # 桥塔宽度
-        tower_width = material_props.get('pier_width', 1.2) * 2
+        tower_width = pier_width * 2
         tower_depth = tower_width
         
-        # 左塔
-        left_tower_pos = -tower_spacing/2
-        left_tower = self._create_tower(
-            pos=(left_tower_pos, 0, 0),
-            width=tower_width,
-            depth=tower_depth,
-            height=tower_height
-        )
-        self.renderer.AddActor(left_tower)
-        self.bridge_components['left_tower'] = left_tower
-        
-        # 右塔
-        right_tower_pos = tower_spacing/2
-        right_tower = self._create_tower(
-            pos=(right_tower_pos, 0, 0),
-            width=tower_width,
-            depth=tower_depth,
-            height=tower_height
-        )
-        self.renderer.AddActor(right_tower)
-        self.bridge_components['right_tower'] = right_tower
-        
         # 创建斜拉索
-        # 在桥面上创建连接点
-        deck_attachments = []
+        # 在桥面上创建连接点：每侧按同一间距排布，只保留塔外侧的点
         num_cables = 12  # 每侧的拉索数量
+        offsets = (np.arange(num_cables) - num_cables/2) * (tower_spacing/2) / num_cables
+        left_x = left_tower_pos + offsets
+        left_x = left_x[left_x < left_tower_pos]
+        right_x = right_tower_pos + offsets
+        right_x = right_x[right_x > right_tower_pos]
+        
+        # 每个纵向位置在桥面两侧各有一个连接点
+        attach_x = np.repeat(np.concatenate([left_x, right_x]), 2)
+        num_attach = len(attach_x)
+        deck_attachments = np.zeros((num_attach, 3))
+        deck_attachments[:, 0] = attach_x
+        deck_attachments[:, 1] = np.tile([-deck_width/2 + 0.5, deck_width/2 - 0.5], num_attach // 2)
+        
+        # 左侧的点连接左塔，右侧的点连接右塔；塔上的连接高度交替排列
+        cable_ids = np.arange(num_attach)
+        is_left = cable_ids < 2 * len(left_x)
+        tower_anchors = np.empty((num_attach, 3))
+        tower_anchors[:, 0] = np.where(is_left, left_tower_pos, right_tower_pos)
+        tower_anchors[:, 1] = deck_attachments[:, 1]
+        tower_anchors[:, 2] = tower_height * (0.6 + (cable_ids % 3) * 0.1)
+        
+        cable_names = [f'{"left" if left else "right"}_cable_{i}' for i, left in zip(cable_ids, is_left)]
+        cables = (cable_names, tower_anchors, deck_attachments)
+        
+        # 桥面中点标记和桥塔顶点标记的位置
+        marker_positions = {
+            'deck_middle': (0, 0, deck_thickness),
+            'left_tower_top': (left_tower_pos, 0, tower_height),
+            'right_tower_top': (right_tower_pos, 0, tower_height)
+        }
         
-        # 左侧连接点
-        for i in range(num_cables):
-            pos = -tower_spacing/2 + (i - num_cables/2) * (tower_spacing/2) / num_cables
-            if pos < left_tower_pos:  # 只处理左侧点
-                deck_attachments.append((pos, -deck_width/2 + 0.5, 0))
-                deck_attachments.append((pos, deck_width/2 - 0.5, 0))
-        
-        # 右侧连接点
-        for i in range(num_cables):
-            pos = tower_spacing/2 + (i - num_cables/2) * (tower_spacing/2) / num_cables
-            if pos > right_tower_pos:  # 只处理右侧点
-                deck_attachments.append((pos, -deck_width/2 + 0.5, 0))
-                deck_attachments.append((pos, deck_width/2 - 0.5, 0))
-        
-        # 创建左塔上的拉索
-        for i, attach_point in enumerate(deck_attachments):
-            if attach_point[0] < left_tower_pos:  # 只连接左侧的点
-                # 计算拉索在塔上的连接高度 - 交替排列
-                height_factor = 0.6 + (i % 3) * 0.1
-                cable = self._create_cable(
-                    start=(left_tower_pos, attach_point[1], tower_height * height_factor),
-                    end=attach_point
-                )
-                self.renderer.AddActor(cable)
-                self.bridge_components[f'left_cable_{i}'] = cable
-        
-        # 创建右塔上的拉索
-        for i, attach_point in enumerate(deck_attachments):
-            if attach_point[0] > right_tower_pos:  # 只连接右侧的点
-                # 计算拉索在塔上的连接高度 - 交替排列
-                height_factor = 0.6 + (i % 3) * 0.1
-                cable = self._create_cable(
-                    start=(right_tower_pos, attach_point[1], tower_height * height_factor),
-                    end=attach_point
-                )
-                self.renderer.AddActor(cable)
-                self.bridge_components[f'right_cable_{i}'] = cable
-        
-        # 添加桥面中点标记和桥塔顶点标记
-        self._add_markers(
-            [(0, 0, deck_thickness)],  # 桥面中点
-            [[1, 0, 0]],  # 红色
-            'deck_middle'
-        )
-        
-        self._add_markers(
-            [(left_tower_pos, 0, tower_height), (right_tower_pos, 0, tower_height)],  # 塔顶点
-            [[0, 1, 0], [0, 1, 0]],  # 绿色
-            ['left_tower_top', 'right_tower_top']
-        )
+        if self._rebuild_needed(cables):
+            # 移除现有组件
+            for component in self.bridge_components.values():
+                self.renderer.RemoveActor(component)
+            self.bridge_components = {}
+            
+            # 创建桥面板
+            deck = self._create_deck(-deck_length/2, -deck_width/2, 0, deck_length, deck_width, deck_thickness)
+            self.renderer.AddActor(deck)
+            self.bridge_components['deck'] = deck
+            
+            # 左塔
+            left_tower = self._create_tower(
+                pos=(left_tower_pos, 0, 0),
+                width=tower_width,
+                depth=tower_depth,
+                height=tower_height
+            )
+            self.renderer.AddActor(left_tower)
+            self.bridge_components['left_tower'] = left_tower
+            
+            # 右塔
+            right_tower = self._create_tower(
+                pos=(right_tower_pos, 0, 0),
+                width=tower_width,
+                depth=tower_depth,
+                height=tower_height
+            )
+            self.renderer.AddActor(right_tower)
+            self.bridge_components['right_tower'] = right_tower
+            
+            # 所有拉索合并为一个演员绘制
+            cables_actor = self._build_all_cables(*cables)
+            self.renderer.AddActor(cables_actor)
+            self.bridge_components['cables'] = cables_actor
+            
+            # 添加标记点：桥面中点为红色，桥塔顶点为绿色
+            markers_actor = self._add_markers(
+                list(marker_positions.values()),
+                [[1, 0, 0], [0, 1, 0], [0, 1, 0]],
+                list(marker_positions)
+            )
+            self.renderer.AddActor(markers_actor)
+            self.bridge_components['markers'] = markers_actor
+        else:
+            # 拓扑不变，直接修改已有数据源的几何参数
+            self._set_deck_box(-deck_length/2, -deck_width/2, 0, deck_length, deck_width, deck_thickness)
+            
+            for name, pos in (('left_tower', left_tower_pos), ('right_tower', right_tower_pos)):
+                points = self.bridge_components[name].GetMapper().GetInput().GetPoints()
+                vtk_to_numpy(points.GetData())[:] = self._tower_vertices((pos, 0, 0), tower_width, tower_depth, tower_height)
+                points.Modified()
+            
+            self._cable_verts_buf[:] = self._cable_coords(*cables[1:])
+            self.cable_points.Modified()
+            
+            for name, pos in marker_positions.items():
+                self._marker_verts_buf[self.marker_ids[name]] = pos
+            self.marker_points.Modified()
+        
+        self._last_params = params
         
         # 重置视图
         self.renderer.ResetCamera()
-        self.vtk_widget.GetRenderWindow().Render()
+        self._schedule_render()
+    
+    def _schedule_render(self):
+        """请求重绘；回到事件循环后统一渲染一次"""
+        if not self._render_scheduled:
+            self._render_scheduled = True
+            QTimer.singleShot(0, self._do_render)
+    
+    def _do_render(self):
+        """执行被合并的渲染请求"""
+        if self._render_scheduled:
+            self._render_scheduled = False
+            # 尚未显示时不渲染，首次显示时会完整渲染一次
+            if self._initialized:
+                self.vtk_widget.GetRenderWindow().Render()
+    
+    def _rebuild_needed(self, cables):
+        """判断是否需要重新创建全部演员：尚未创建过模型或拉索的组成发生变化"""
+        return self._last_params is None or cables[0] != list(self.cable_cells)
     
     def _add_markers(self, positions, colors, names):
-        """添加标记点"""
+        """
+        添加标记点
+        
+        所有标记点共用一个低分辨率球体，通过 vtkGlyph3D 以一个演员绘制；
+        点编号记录在 self.marker_ids 中，颜色保存在点数据 "Colors" 中以便单独高亮
+        """
         if not isinstance(names, list):
             names = [names]
         
-        for i, (pos, color) in enumerate(zip(positions, colors)):
-            # 创建球体
-            sphere = vtk.vtkSphereSource()
-            sphere.SetCenter(pos)
-            sphere.SetRadius(0.5)
-            sphere.SetPhiResolution(16)
-            sphere.SetThetaResolution(16)
-            
-            # 创建映射器和演员
-            mapper = vtk.vtkPolyDataMapper()
-            mapper.SetInputConnection(sphere.GetOutputPort())
-            
-            actor = vtk.vtkActor()
-            actor.SetMapper(mapper)
-            actor.GetProperty().SetColor(color)
-            
-            self.renderer.AddActor(actor)
-            self.bridge_components[names[i]] = actor
+        # 坐标与颜色先写入 numpy 缓冲区，再以浅拷贝方式交给 VTK
+        self._marker_verts_buf = np.ascontiguousarray(positions, dtype=np.float32)
+        self._marker_colors_buf = np.array([_to_rgba255(color) for color in colors], dtype=np.uint8)
+        self.marker_ids = {name: idx for idx, name in enumerate(names)}
+        
+        points = vtk.vtkPoints()
+        points.SetData(numpy_to_vtk(self._marker_verts_buf, deep=False))
+        marker_colors = numpy_to_vtk(self._marker_colors_buf, deep=False)
+        marker_colors.SetName("Colors")
+        
+        self.marker_points = points
+        self.marker_colors = marker_colors
+        self._marker_defaults = self._marker_colors_buf.copy()
+        
+        polyData = vtk.vtkPolyData()
+        polyData.SetPoints(points)
+        polyData.GetPointData().SetScalars(marker_colors)
+        
+        # 创建球体
+        sphere = vtk.vtkSphereSource()
+        sphere.SetRadius(0.5)
+        sphere.SetPhiResolution(8)
+        sphere.SetThetaResolution(8)
+        
+        # 在每个标记点处放置一个球体，颜色取自点数据，不按标量缩放
+        glyph = vtk.vtkGlyph3D()
+        glyph.SetInputData(polyData)
+        glyph.SetSourceConnection(sphere.GetOutputPort())
+        glyph.SetScaleModeToDataScalingOff()
+        glyph.SetColorModeToColorByScalar()
+        
+        # 创建映射器和演员
+        mapper = vtk.vtkPolyDataMapper()
+        mapper.SetInputConnection(glyph.GetOutputPort())
+        mapper.SetColorModeToDirectScalars()
+        
+        actor = vtk.vtkActor()
+        actor.SetMapper(mapper)
+        
+        return actor
     
-    def _create_tower(self, pos, width, depth, height):
-        """创建桥塔"""
+    def _set_marker_color(self, name, color):
+        """修改单个标记点的颜色"""
+        self._marker_colors_buf[self.marker_ids[name]] = _to_rgba255(color)
+        self.marker_colors.Modified()
+    
+    def _tower_vertices(self, pos, width, depth, height):
+        """计算桥塔8个顶点的坐标（底部四个点在前，顶部四个点在后）"""
         x, y, z = pos
         
         # 桥塔顶部略窄
         top_width = width * 0.8
         top_depth = depth * 0.8
         
-        # 创建一个具有8个顶点的立方体
+        return np.array([
+            # 底部四个点
+            [x-width/2, y-depth/2, z],
+            [x+width/2, y-depth/2, z],
+            [x+width/2, y+depth/2, z],
+            [x-width/2, y+depth/2, z],
+            # 顶部四个点
+            [x-top_width/2, y-top_depth/2, z+height],
+            [x+top_width/2, y-top_depth/2, z+height],
+            [x+top_width/2, y+top_depth/2, z+height],
+            [x-top_width/2, y+top_depth/2, z+height]
+        ])
+    
+    def _create_tower(self, pos, width, depth, height):
+        """创建桥塔"""
+        # 创建一个具有8个顶点的立方体，坐标一次性写入
         points = vtk.vtkPoints()
-        # 底部四个点
-        points.InsertNextPoint(x-width/2, y-depth/2, z)
-        points.InsertNextPoint(x+width/2, y-depth/2, z)
-        points.InsertNextPoint(x+width/2, y+depth/2, z)
-        points.InsertNextPoint(x-width/2, y+depth/2, z)
-        # 顶部四个点
-        points.InsertNextPoint(x-top_width/2, y-top_depth/2, z+height)
-        points.InsertNextPoint(x+top_width/2, y-top_depth/2, z+height)
-        points.InsertNextPoint(x+top_width/2, y+top_depth/2, z+height)
-        points.InsertNextPoint(x-top_width/2, y+top_depth/2, z+height)
-        
-        # 定义立方体的六个面
+        points.SetData(numpy_to_vtk(self._tower_vertices(pos, width, depth, height), deep=True))
+        
+        # 定义立方体的六个面（每个面是一个四边形）
         faces = vtk.vtkCellArray()
+        faces.SetCells(6, numpy_to_vtkIdTypeArray(_TOWER_CELLS, deep=True))
         
-        # 添加六个面（每个面是一个四边形）
-        quad = vtk.vtkQuad()
-        # 底面
-        quad.GetPointIds().SetId(0, 0)
-        quad.GetPointIds().SetId(1, 1)
-        quad.GetPointIds().SetId(2, 2)
-        quad.GetPointIds().SetId(3, 3)
-        faces.InsertNextCell(quad)
-        
-        # 顶面
-        quad = vtk.vtkQuad()
-        quad.GetPointIds().SetId(0, 4)
-        quad.GetPointIds().SetId(1, 5)
-        quad.GetPointIds().SetId(2, 6)
-        quad.GetPointIds().SetId(3, 7)
-        faces.InsertNextCell(quad)
-        
-        # 前面
-        quad = vtk.vtkQuad()
-        quad.GetPointIds().SetId(0, 0)
-        quad.GetPointIds().SetId(1, 1)
-        quad.GetPointIds().SetId(2, 5)
-        quad.GetPointIds().SetId(3, 4)
-        faces.InsertNextCell(quad)
-        
-        # 右面
-        quad = vtk.vtkQuad()
-        quad.GetPointIds().SetId(0, 1)
-        quad.GetPointIds().SetId(1, 2)
-        quad.GetPointIds().SetId(2, 6)
-        quad.GetPointIds().SetId(3, 5)
-        faces.InsertNextCell(quad)
-        
-        # 后面
-        quad = vtk.vtkQuad()
-        quad.GetPointIds().SetId(0, 2)
-        quad.GetPointIds().SetId(1, 3)
-        quad.GetPointIds().SetId(2, 7)
-        quad.GetPointIds().SetId(3, 6)
-        faces.InsertNextCell(quad)
-        
-        # 左面
-        quad = vtk.vtkQuad()
-        quad.GetPointIds().SetId(0, 3)
-        quad.GetPointIds().SetId(1, 0)
-        quad.GetPointIds().SetId(2, 4)
-        quad.GetPointIds().SetId(3, 7)
-        faces.InsertNextCell(quad)
+        # 每个面的损伤颜色索引，初始为默认灰色
+        damage = numpy_to_vtk(np.full(6, NEUTRAL_DAMAGE_INDEX, dtype=np.uint8), deep=True)
+        damage.SetName("Damage")
         
         # 创建多边形数据
         polyData = vtk.vtkPolyData()
         polyData.SetPoints(points)
         polyData.SetPolys(faces)
+        polyData.GetCellData().SetScalars(damage)
         
-        # 创建映射器
+        # 创建映射器，单元标量经损伤查找表映射为颜色
         mapper = vtk.vtkPolyDataMapper()
         mapper.SetInputData(polyData)
+        mapper.SetLookupTable(self._damage_lut)
+        mapper.UseLookupTableScalarRangeOn()
+        mapper.SetScalarModeToUseCellData()
+        mapper.SetColorModeToMapScalars()
         
         # 创建演员
         actor = vtk.vtkActor()
@@ -285,69 +456,101 @@ class BridgeVisualizerWidget(QWidget):
         
         return actor
     
-    def _create_cable(self, start, end):
-        """创建拉索"""
-        # 为了视觉效果，给拉索添加一点弯曲
-        x1, y1, z1 = start
-        x2, y2, z2 = end
-        
-        # 计算中点并稍微下移
-        mid_x = (x1 + x2) / 2
-        mid_y = (y1 + y2) / 2
-        mid_z = (z1 + z2) / 2 - 0.03 * np.sqrt((x2-x1)**2 + (y2-y1)**2 + (z2-z1)**2)
-        
-        # 创建三次样条曲线
-        points = vtk.vtkPoints()
-        points.InsertNextPoint(x1, y1, z1)
-        points.InsertNextPoint(mid_x, mid_y, mid_z)
-        points.InsertNextPoint(x2, y2, z2)
-        
-        # 创建样条
-        spline = vtk.vtkParametricSpline()
-        spline.SetPoints(points)
+    def _build_all_cables(self, names, starts, ends):
+        """
+        将全部拉索合并为一个数据集，只用一个演员绘制
+        
+        参数:
+            names: 拉索名称列表
+            starts: 塔上锚点坐标，形状为 (拉索数, 3)
+            ends: 桥面锚点坐标，形状为 (拉索数, 3)
+            
+        返回:
+            拉索演员；每根拉索对应一个线单元，单元编号记录在 self.cable_cells 中，
+            颜色保存在单元数据 "Colors" 中以便单独高亮
+        """
+        # 每根拉索为一条直线段，两个端点在点集中相邻存放；
+        # 坐标、连接关系和颜色都以 numpy 缓冲区浅拷贝交给 VTK
+        num_cables = len(names)
+        self._cable_verts_buf = np.ascontiguousarray(self._cable_coords(starts, ends), dtype=np.float32)
+        # 单元 i 的端点为 connectivity[offsets[i]:offsets[i+1]]，即点 2i 和 2i+1
+        self._cable_offsets_buf = np.arange(0, 2 * num_cables + 1, 2, dtype=ID_TYPE_CODE)
+        self._cable_conn_buf = np.arange(2 * num_cables, dtype=ID_TYPE_CODE)
+        self._cable_colors_buf = np.tile(np.array(CABLE_COLOR_RGBA, dtype=np.uint8), (num_cables, 1))
         
-        # 创建样条函数源
-        functionSource = vtk.vtkParametricFunctionSource()
-        functionSource.SetParametricFunction(spline)
-        functionSource.SetUResolution(20)
+        points = vtk.vtkPoints()
+        points.SetData(numpy_to_vtk(self._cable_verts_buf, deep=False))
+        lines = vtk.vtkCellArray()
+        # 以偏移量/连接关系两个数组直接设置单元，vtkCellArray 引用这两个数组而不再复制
+        lines.SetData(numpy_to_vtkIdTypeArray(self._cable_offsets_buf, deep=False),
+                      numpy_to_vtkIdTypeArray(self._cable_conn_buf, deep=False))
+        colors = numpy_to_vtk(self._cable_colors_buf, deep=False)
+        colors.SetName("Colors")
+        self.cable_cells = {name: cell_id for cell_id, name in enumerate(names)}
+        
+        # 保留点集引用，更新模型时就地修改坐标
+        self.cable_points = points
         
-        # 创建管道表示拉索
-        tubeFilter = vtk.vtkTubeFilter()
-        tubeFilter.SetInputConnection(functionSource.GetOutputPort())
-        tubeFilter.SetRadius(0.1)
-        tubeFilter.SetNumberOfSides(8)
+        polyData = vtk.vtkPolyData()
+        polyData.SetPoints(points)
+        polyData.SetLines(lines)
+        polyData.GetCellData().SetScalars(colors)
+        self.cable_colors = colors
         
-        # 创建映射器
+        # 直接以线段绘制，不再生成管状网格
         mapper = vtk.vtkPolyDataMapper()
-        mapper.SetInputConnection(tubeFilter.GetOutputPort())
+        mapper.SetInputData(polyData)
+        mapper.SetScalarModeToUseCellFieldData()
+        mapper.SelectColorArray("Colors")
+        mapper.SetColorModeToDirectScalars()
         
         # 创建演员
         actor = vtk.vtkActor()
         actor.SetMapper(mapper)
-        actor.GetProperty().SetColor(0.9, 0.9, 0.9)
+        actor.GetProperty().SetLineWidth(2.0)
         
         return actor
     
+    def _cable_coords(self, starts, ends):
+        """将拉索起终点交错排列为 (2×拉索数, 3) 的点坐标数组"""
+        return np.stack([starts, ends], axis=1).reshape(-1, 3)
+    
+    def _set_tower_damage(self, name, idx):
+        """将桥塔的损伤颜色索引写入其单元标量"""
+        mapper = self.bridge_components[name].GetMapper()
+        damage = mapper.GetInput().GetCellData().GetScalars()
+        vtk_to_numpy(damage)[:] = idx
+        damage.Modified()
+        mapper.ScalarVisibilityOn()
+    
+    def _set_cable_color(self, name, color):
+        """修改单根拉索的颜色"""
+        self._cable_colors_buf[self.cable_cells[name]] = _to_rgba255(color)
+        self.cable_colors.Modified()
+    
     def _create_deck(self, x, y, z, length, width, height):
         """创建桥面板3D模型"""
-        # 创建立方体
-        cubeSource = vtk.vtkCubeSource()
-        cubeSource.SetCenter(x + length/2, y + width/2, z + height/2)
-        cubeSource.SetXLength(length)
-        cubeSource.SetYLength(width)
-        cubeSource.SetZLength(height)
+        # 共用单位立方体，尺寸和位置由演员的变换矩阵给出
+        self._set_deck_box(x, y, z, length, width, height)
         
         # 创建映射器
         mapper = vtk.vtkPolyDataMapper()
-        mapper.SetInputConnection(cubeSource.GetOutputPort())
+        mapper.SetInputConnection(_UNIT_CUBE.GetOutputPort())
         
         # 创建演员
         actor = vtk.vtkActor()
         actor.SetMapper(mapper)
         actor.GetProperty().SetColor(0.5, 0.5, 0.5)
+        actor.SetUserTransform(self._deck_transform)
         
         return actor
     
+    def _set_deck_box(self, x, y, z, length, width, height):
+        """将单位立方体变换到以 (x, y, z) 为角点、给定长宽高的长方体"""
+        self._deck_transform.Identity()
+        self._deck_transform.Translate(x + length/2, y + width/2, z + height/2)
+        self._deck_transform.Scale(length, width, height)
+    
     def update_model(self, params):
         """更新模型参数"""
         span_length = params.get("span_length", self.default_params["span_length"])
@@ -359,51 +562,53 @@ class BridgeVisualizerWidget(QWidget):
     def highlight_component(self, component_name, color=(1.0, 0.5, 0.0)):
         """高亮显示某个构件，用于损伤标识"""
         if component_name in self.bridge_components:
-            self.bridge_components[component_name].GetProperty().SetColor(color)
-            self.vtk_widget.GetRenderWindow().Render()
+            actor = self.bridge_components[component_name]
+            if component_name in ('left_tower', 'right_tower'):
+                # 桥塔平时按损伤标量着色，高亮时改用演员颜色
+                actor.GetMapper().ScalarVisibilityOff()
+            actor.GetProperty().SetColor(color)
+            self._schedule_render()
+        elif component_name in self.cable_cells:
+            # 拉索合并在同一个演员中，只修改对应单元的颜色
+            self._set_cable_color(component_name, color)
+            self._schedule_render()
+        elif component_name in self.marker_ids:
+            self._set_marker_color(component_name, color)
+            self._schedule_render()
     
     def reset_highlights(self):
         """重置所有高亮显示"""
         for name, component in self.bridge_components.items():
-            if 'tower' in name or name in ['left_tower', 'right_tower']:
-                component.GetProperty().SetColor(0.5, 0.5, 0.5)
-            elif 'deck' in name:
-                component.GetProperty().SetColor(0.5, 0.5, 0.5)
-            elif 'cable' in name:
-                component.GetProperty().SetColor(0.9, 0.9, 0.9)
-        self.vtk_widget.GetRenderWindow().Render()
+            if name in ['left_tower', 'right_tower']:
+                self._set_tower_damage(name, NEUTRAL_DAMAGE_INDEX)
+            elif name == 'deck':
+                component.GetProperty().SetColor(DAMAGE_COLORS[NEUTRAL_DAMAGE_INDEX])
+        if self.cable_cells:
+            self._cable_colors_buf[:] = CABLE_COLOR_RGBA
+            self.cable_colors.Modified()
+        if self.marker_ids:
+            self._marker_colors_buf[:] = self._marker_defaults
+            self.marker_colors.Modified()
+        self._schedule_render()
     
     def set_damage_visualization(self, damage_data):
         """根据损伤状态设置可视化效果"""
-        # 定义损伤状态的颜色映射
-        damage_colors = {
-            'NO_DAMAGE': (0, 1, 0),     # 绿色
-            'SLIGHT': (1, 1, 0),        # 黄色
-            'MODERATE': (1, 0.5, 0),    # 橙色
-            'EXTENSIVE': (1, 0, 0),     # 红色
-            'COMPLETE': (0.5, 0, 0)     # 深红色
-        }
-        
         # 重置所有高亮
         self.reset_highlights()
         
-        # 如果有损伤数据，应用到模型中
+        # 如果有损伤数据，应用到模型中；颜色由损伤状态的值索引
         if damage_data and 'time_history' in damage_data:
             # 墩柱损伤
-            pier_damage = damage_data['time_history'].get('pier_damage_state')
-            if pier_damage and pier_damage.name in damage_colors:
-                color = damage_colors[pier_damage.name]
-                if 'left_tower' in self.bridge_components:
-                    self.bridge_components['left_tower'].GetProperty().SetColor(color)
-                if 'right_tower' in self.bridge_components:
-                    self.bridge_components['right_tower'].GetProperty().SetColor(color)
+            pier_damage = damage_data['time_history'].pier_damage_state
+            if pier_damage is not None:
+                for name in ('left_tower', 'right_tower'):
+                    if name in self.bridge_components:
+                        self._set_tower_damage(name, pier_damage.value)
             
             # 桥面板损伤
-            deck_damage = damage_data['time_history'].get('deck_damage_state')
-            if deck_damage and deck_damage.name in damage_colors:
-                color = damage_colors[deck_damage.name]
-                if 'deck' in self.bridge_components:
-                    self.bridge_components['deck'].GetProperty().SetColor(color)
+            deck_damage = damage_data['time_history'].deck_damage_state
+            if deck_damage is not None and 'deck' in self.bridge_components:
+                self.bridge_components['deck'].GetProperty().SetColor(DAMAGE_COLORS[deck_damage.value])
         
         # 更新渲染
-        self.vtk_widget.GetRenderWindow().Render() 
\ No newline at end of file
+        self._schedule_render()